@@ -2,32 +2,180 @@
 # ruff-check-hook.sh
 # Lint Python files with ruff check
 # Reads JSON from stdin (Claude Code hook format)
+#
+# Results are cached by file content (plus the ruff config files that apply
+# and the ruff binary), so re-saving unchanged content does not re-run ruff.
+#
+# Deferred mode (--deferred, or RUFF_HOOK_DEFERRED=1): PostToolUse only
+# records the edited file; the hook registered on Stop then lints every
+# recorded file in one ruff invocation and prints the same per-file report.
+#
+# Findings are shown in ruff's concise format (one line per finding); the
+# "Found N errors" footer is dropped because reports are split per file.
+
+CACHE_DIR="${RUFF_HOOK_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/ruff-check-hook}"
+DEFERRED="${RUFF_HOOK_DEFERRED:-}"
+[[ "$1" == "--deferred" ]] && DEFERRED=1
 
 # Read JSON from stdin
 INPUT=$(cat)
 
-# Extract file path using jq
-FILE_PATH=$(echo "$INPUT" | jq -r '.tool_input.file_path // empty')
+# Read a string field from the payload. When the key occurs once and the
+# value has no escapes it is matched directly, otherwise jq is used.
+json_field() {
+    local rest="${INPUT#*\"$1\"}"
+    local re='^[[:space:]]*:[[:space:]]*"([^"\\]*)"'
+    [[ "$rest" == "$INPUT" ]] && return
+    if [[ "$rest" != *"\"$1\""* && "$rest" =~ $re ]]; then
+        printf '%s\n' "${BASH_REMATCH[1]}"
+    else
+        printf '%s' "$INPUT" | jq -r "$2 // empty"
+    fi
+}
 
-# Exit if no file path or not a Python file
-[[ -z "$FILE_PATH" ]] && exit 0
-[[ "$FILE_PATH" != *.py ]] && exit 0
+# Absolute path with . and .. resolved, the form ruff reports paths in
+normalize_path() {
+    local path="$1" part out=()
+    [[ "$path" != /* ]] && path="$PWD/$path"
+    IFS=/ read -ra parts <<< "$path"
+    for part in "${parts[@]}"; do
+        case "$part" in
+            "" | .) ;;
+            ..) [[ ${#out[@]} -gt 0 ]] && unset "out[${#out[@]}-1]" ;;
+            *) out+=("$part") ;;
+        esac
+    done
+    local IFS=/
+    echo "/${out[*]}"
+}
+
+if command -v sha256sum &> /dev/null; then
+    HASH=(sha256sum)
+else
+    HASH=(shasum -a 256)
+fi
+
+# Cache key: path, working directory (ruff prints paths relative to it),
+# content and every ruff config file from here to /
+cache_key() {
+    local dir="${1%/*}" cfg key
+    key=$({
+        printf '%s\n%s\n' "$1" "$PWD"
+        cat "$1"
+        while :; do
+            for cfg in pyproject.toml ruff.toml .ruff.toml; do
+                [[ -f "$dir/$cfg" ]] && cat "$dir/$cfg"
+            done
+            [[ -z "$dir" ]] && break
+            dir="${dir%/*}"
+        done
+    } | "${HASH[@]}")
+    echo "${key%% *}"
+}
+
+report() {
+    [[ -z "$2" ]] && return
+    echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+    echo "🔍 Ruff: $(basename "$1")"
+    echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+    echo "$2" | head -15
+    echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+}
+
+# Lint files whose content is not cached (one ruff run), then report all
+check_files() {
+    local keys=() misses=() file key i output status line out prefix prefixes physical
+    for file in "$@"; do
+        key=$(cache_key "$file")
+        keys+=("$key")
+        if [[ -f "$CACHE_DIR/$key" ]]; then
+            touch "$CACHE_DIR/$key"  # keeps it from being pruned while in use
+        else
+            misses+=("$file")
+        fi
+    done
+
+    if [[ ${#misses[@]} -gt 0 ]]; then
+        output=$(ruff check --output-format concise "${misses[@]}" 2> "$CACHE_DIR/.stderr")
+        status=$?
+        if [[ $status -gt 1 ]]; then
+            # Config or usage error: show it, cache nothing
+            report "${misses[0]}" "$(cat "$CACHE_DIR/.stderr")"
+            return
+        fi
+        physical=$(pwd -P)
+        for i in "${!keys[@]}"; do
+            file="${@:i+1:1}"
+            [[ -f "$CACHE_DIR/${keys[i]}" ]] && continue
+            # ruff shows a file relative to the working directory when under it
+            prefixes=("$file")
+            [[ "$file" == "$PWD"/* ]] && prefixes+=("${file#"$PWD"/}")
+            [[ "$file" == "$physical"/* ]] && prefixes+=("${file#"$physical"/}")
+            out=""
+            while IFS= read -r line; do
+                for prefix in "${prefixes[@]}"; do
+                    if [[ "$line" == "$prefix":[0-9]* ]]; then
+                        out+="$line"$'\n'
+                        break
+                    fi
+                done
+            done <<< "$output"
+            printf '%s' "$out" > "$CACHE_DIR/${keys[i]}"
+        done
+    fi
+
+    for i in "${!keys[@]}"; do
+        report "${@:i+1:1}" "$(cat "$CACHE_DIR/${keys[i]}" 2> /dev/null)"
+    done
+}
 
 # Check if ruff is installed
 if ! command -v ruff &> /dev/null; then
     exit 0
 fi
 
+mkdir -p "$CACHE_DIR"
+
+# A different or upgraded ruff may report differently: start a fresh cache
+RUFF_BIN=$(command -v ruff)
+if [[ ! -f "$CACHE_DIR/.ruff" || "$RUFF_BIN" -nt "$CACHE_DIR/.ruff" || "$(< "$CACHE_DIR/.ruff")" != "$RUFF_BIN" ]]; then
+    rm -f "$CACHE_DIR"/[0-9a-f]*
+    echo "$RUFF_BIN" > "$CACHE_DIR/.ruff"
+fi
+
+SESSION_ID=$(json_field session_id .session_id)
+QUEUE="$CACHE_DIR/pending-${SESSION_ID:-default}"
+
+# Stop: lint everything deferred during this session in one run
+if [[ "$(json_field hook_event_name .hook_event_name)" == "Stop" ]]; then
+    BATCH="$QUEUE.$$"
+    mv "$QUEUE" "$BATCH" 2> /dev/null || exit 0
+    FILES=()
+    while IFS= read -r FILE_PATH; do
+        [[ -f "$FILE_PATH" ]] && FILES+=("$FILE_PATH")
+    done < <(sort -u "$BATCH")
+    rm -f "$BATCH"
+    [[ ${#FILES[@]} -gt 0 ]] && check_files "${FILES[@]}"
+
+    # Drop results not used in a week (hits refresh the mtime)
+    find "$CACHE_DIR" -type f -name '[0-9a-f]*' -mtime +7 -delete 2> /dev/null
+    exit 0
+fi
+
+# Extract file path
+FILE_PATH=$(json_field file_path .tool_input.file_path)
+
+# Exit if no file path or not a Python file
+[[ -z "$FILE_PATH" ]] && exit 0
+[[ "$FILE_PATH" != *.py ]] && exit 0
+FILE_PATH=$(normalize_path "$FILE_PATH")
+
 # Run linting (if file exists)
 if [[ -f "$FILE_PATH" ]]; then
-    LINT_OUTPUT=$(ruff check "$FILE_PATH" 2>&1)
-
-    if [ -n "$LINT_OUTPUT" ]; then
-        echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-        echo "🔍 Ruff: $(basename "$FILE_PATH")"
-        echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-        echo "$LINT_OUTPUT" | head -15
-        echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+    if [[ -n "$DEFERRED" ]]; then
+        echo "$FILE_PATH" >> "$QUEUE"
+    else
+        check_files "$FILE_PATH"
     fi
 fi
 
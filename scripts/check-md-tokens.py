@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Markdown Token Check - enforce .mdtokenrc.yaml limits with a content-hash cache.
+
+Reads the same configuration as mdtoken (per-path `limits`, `default_limit`,
+`exclude`, `total_limit`, `fail_on_exceed`) and counts tokens across a
+worker pool. Counts are cached per file content hash, so a run only
+tokenizes files whose content changed; the aggregate limit is still
+enforced over every markdown file.
+
+Without tiktoken, counts are a chars/4 estimate and limits only warn: a
+guess never fails a commit.
+
+Usage:
+    ./check-md-tokens.py                  # Check all markdown files
+    ./check-md-tokens.py README.md ...    # Pre-commit: report limits for these files
+    ./check-md-tokens.py --no-cache       # Re-count everything
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+CONFIG_FILE = REPO_ROOT / ".mdtokenrc.yaml"
+CACHE_FILE = REPO_ROOT / ".cache" / "mdtoken-counts.json"
+
+# tiktoken encoding used for counting (mdtoken's Claude models map to cl100k)
+ENCODING = "cl100k_base"
+
+_encoder = None
+
+def load_config(path: Path) -> dict:
+    """Load .mdtokenrc.yaml, with a fallback parser for its flat layout."""
+    text = path.read_text()
+    try:
+        import yaml
+        return yaml.safe_load(text) or {}
+    except ImportError:
+        pass
+
+    # Top-level scalars, one mapping (`limits:`) and one list (`exclude:`)
+    config, section = {}, None
+    for raw in text.splitlines():
+        if raw.lstrip().startswith("#"):
+            continue
+        line = raw.split(" #", 1)[0].rstrip()
+        if not line.strip():
+            continue
+        stripped = line.strip()
+        if not raw[0].isspace():
+            key, _, value = stripped.partition(":")
+            value = value.strip().strip('"\'')
+            if value:
+                config[key] = int(value) if value.isdigit() else {"true": True, "false": False}.get(value, value)
+                section = None
+            else:
+                section = key
+                config[key] = None
+        elif section and stripped.startswith("- "):
+            config[section] = (config[section] or []) + [stripped[2:].strip().strip('"\'')]
+        elif section:
+            key, _, value = stripped.partition(":")
+            config[section] = config[section] or {}
+            config[section][key.strip().strip('"\'')] = int(value.strip())
+    return config
+
+def is_excluded(rel_path: str, patterns: list) -> bool:
+    """Match a repo-relative path against exclude globs."""
+    return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(rel_path + "/", p)
+               for p in patterns)
+
+def limit_for(rel_path: str, config: dict) -> int:
+    """Per-file limit: the most specific matching `limits` key wins.
+
+    Keys with glob characters are matched as globs, others as exact paths
+    or substrings (mdtoken's "commands/" style).
+    """
+    best_key, best_limit = None, config.get("default_limit", 4000)
+    for key, limit in (config.get("limits") or {}).items():
+        if any(c in key for c in "*?["):
+            matched = fnmatch.fnmatch(rel_path, key)
+        else:
+            matched = rel_path == key or key in rel_path
+        if matched and (best_key is None or len(key) > len(best_key)):
+            best_key, best_limit = key, limit
+    return best_limit
+
+def find_markdown(root: Path, exclude: list) -> list:
+    """Markdown files git would commit (tracked or not ignored), minus excludes.
+
+    Outside a git checkout, falls back to walking the tree.
+    """
+    try:
+        listed = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", "*.md"],
+            cwd=root, capture_output=True, check=True,
+        ).stdout.decode().split("\0")
+    except (OSError, subprocess.CalledProcessError):
+        return walk_markdown(root, exclude)
+    return sorted({f for f in listed
+                   if f and not is_excluded(f, exclude) and (root / f).is_file()})
+
+def walk_markdown(root: Path, exclude: list) -> list:
+    """All markdown files under root, pruning excluded directories."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        rel_dir = "" if rel_dir == "." else rel_dir + "/"
+        dirnames[:] = [d for d in dirnames if not is_excluded(rel_dir + d, exclude)]
+        for name in filenames:
+            if name.endswith(".md") and not is_excluded(rel_dir + name, exclude):
+                files.append(rel_dir + name)
+    return sorted(files)
+
+def count_tokens(text: str) -> int:
+    """Count tokens in one worker process (encoder loaded once per process)."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding(ENCODING)
+        except ImportError:
+            _encoder = False
+    if _encoder is False:
+        return len(text) // 4  # rough estimate without tiktoken
+    return len(_encoder.encode(text, disallowed_special=()))
+
+def load_cache(path: Path) -> dict:
+    """Load the count cache; a different tokenizer invalidates it."""
+    try:
+        cache = json.loads(path.read_text())
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get("encoding") != tokenizer_name():
+        cache = {}
+    cache.setdefault("encoding", tokenizer_name())
+    cache.setdefault("files", {})   # path -> [mtime_ns, size, sha256]
+    cache.setdefault("counts", {})  # sha256 -> tokens
+    return cache
+
+def tokenizer_name() -> str:
+    """Identify the active tokenizer so cached counts are not mixed."""
+    try:
+        import tiktoken  # noqa: F401
+        return ENCODING
+    except ImportError:
+        return "chars/4"
+
+def measure(files: list, cache: dict, jobs: int = None) -> dict:
+    """Token counts for files, tokenizing only content not already cached."""
+    hashes, pending = {}, {}
+
+    for rel_path in files:
+        path = REPO_ROOT / rel_path
+        stat = path.stat()
+        known = cache["files"].get(rel_path)
+        # Unchanged mtime and size: trust the recorded hash without reading
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size \
+                and known[2] in cache["counts"]:
+            hashes[rel_path] = known[2]
+            continue
+
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        cache["files"][rel_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        hashes[rel_path] = digest
+        if digest not in cache["counts"]:
+            pending[digest] = data.decode("utf-8", errors="ignore")
+
+    if pending:
+        digests = list(pending)
+        if len(digests) == 1:
+            counts = [count_tokens(pending[digests[0]])]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                counts = list(pool.map(count_tokens, (pending[d] for d in digests), chunksize=8))
+        cache["counts"].update(zip(digests, counts))
+
+    # Drop entries for files that no longer exist and their orphaned counts
+    cache["files"] = {p: v for p, v in cache["files"].items() if p in hashes}
+    live = {v[2] for v in cache["files"].values()}
+    cache["counts"] = {d: c for d, c in cache["counts"].items() if d in live}
+
+    return {rel_path: cache["counts"][digest] for rel_path, digest in hashes.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Check markdown token limits (.mdtokenrc.yaml)")
+    parser.add_argument("files", nargs="*", help="Only report per-file limits for these files")
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE, help="Config file")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and rebuild the count cache")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    exclude = config.get("exclude") or []
+    files = find_markdown(REPO_ROOT, exclude)
+
+    cache = load_cache(Path(os.devnull) if args.no_cache else CACHE_FILE)
+    counts = measure(files, cache, args.jobs)
+
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    CACHE_FILE.write_text(json.dumps(cache))
+
+    estimated = tokenizer_name() != ENCODING
+    if estimated:
+        print("⚠️  tiktoken not installed; using a chars/4 estimate, limits are not enforced "
+              "(pip install tiktoken)")
+
+    # Per-file limits: only the files pre-commit passed, or everything
+    selected = files
+    if args.files:
+        wanted = {os.path.relpath(Path(f).resolve(), REPO_ROOT.resolve()) for f in args.files}
+        selected = [f for f in files if f in wanted]
+
+    violations = []
+    for rel_path in selected:
+        limit = limit_for(rel_path, config)
+        if counts[rel_path] > limit:
+            violations.append((rel_path, counts[rel_path], limit))
+
+    marker = "⚠️ " if estimated else "❌"
+    for rel_path, tokens, limit in violations:
+        print(f"{marker} {rel_path}: {tokens} tokens (limit {limit}, over by {tokens - limit})")
+
+    total = sum(counts.values())
+    total_limit = config.get("total_limit")
+    over_total = bool(total_limit) and total > total_limit
+    if total_limit:
+        marker = ("⚠️ " if estimated else "❌") if over_total else "✓"
+        print(f"{marker} Total: {total} tokens across {len(files)} files (limit {total_limit})")
+
+    if not violations and not over_total:
+        print(f"✅ {len(selected)} markdown files within limits")
+        return 0
+
+    if estimated:
+        return 0
+    return 1 if config.get("fail_on_exceed", True) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
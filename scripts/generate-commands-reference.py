@@ -1,117 +1,314 @@
 #!/usr/bin/env python3
 """
-Generate commands reference documentation from plugin.json files.
+Generate commands reference documentation from the plugin catalog.
 
-Scans all plugins and creates a comprehensive commands reference
-with categorization, descriptions, and cross-references.
+Maintains a persistent SQLite catalog of every plugin's commands, agents
+and skills (with their frontmatter description, allowed-tools and
+argument-hint), updated incrementally by content hash. The reference doc
+is rewritten only when the rendered content actually changes.
+
+Usage:
+    ./generate-commands-reference.py              # Update catalog + docs
+    ./generate-commands-reference.py --force      # Re-parse every file
+    ./generate-commands-reference.py --lookup git # Query the catalog
 """
 
+import argparse
+import hashlib
 import json
 import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 
 # Configuration
-PLUGINS_DIR = Path(__file__).parent.parent / "plugins"
-OUTPUT_FILE = Path(__file__).parent.parent / "docs" / "reference" / "commands.md"
+REPO_ROOT = Path(__file__).parent.parent
+PLUGINS_DIR = REPO_ROOT / "plugins"
+OUTPUT_FILE = REPO_ROOT / "docs" / "reference" / "commands.md"
+CATALOG_PATH = REPO_ROOT / ".cache" / "plugin-catalog.db"
+
+# Catalog entry kinds and the files that define them, relative to a plugin
+ENTRY_GLOBS = {
+    'command': "commands/*.md",
+    'agent': "agents/*.md",
+    'skill': "skills/*/SKILL.md",
+}
+
+def init_catalog(conn: sqlite3.Connection):
+    """Initialize catalog schema."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS plugins (
+            name TEXT PRIMARY KEY,
+            manifest_path TEXT,
+            content_hash TEXT,
+            version TEXT,
+            description TEXT,
+            category TEXT,
+            repository_url TEXT,
+            updated_at TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS entries (
+            path TEXT PRIMARY KEY,
+            plugin TEXT,
+            kind TEXT,
+            name TEXT,
+            description TEXT,
+            allowed_tools TEXT,
+            argument_hint TEXT,
+            content_hash TEXT,
+            updated_at TEXT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_entries_name ON entries(name);
+        CREATE INDEX IF NOT EXISTS idx_entries_plugin ON entries(plugin, kind);
+    """)
+
+def parse_frontmatter(text: str) -> Dict[str, str]:
+    """Parse the flat `key: value` YAML frontmatter used by plugin markdown.
+
+    Only the subset the plugins use is supported: scalar values, quoted
+    strings and inline `[a, b]` lists (returned as comma-joined strings).
+    """
+    if not text.startswith('---'):
+        return {}
+    end = text.find('\n---', 3)
+    if end == -1:
+        return {}
 
-def load_plugin_manifest(plugin_path: Path) -> Dict[str, Any]:
+    fields = {}
+    for line in text[3:end].splitlines():
+        key, sep, value = line.partition(':')
+        if not sep or line[:1].isspace():
+            continue
+        value = value.strip()
+        if value.startswith('[') and value.endswith(']'):
+            value = ", ".join(v.strip().strip('"\'') for v in value[1:-1].split(',') if v.strip())
+        elif len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        fields[key.strip()] = value
+    return fields
+
+def read_entry(path: Path, known_hash: Optional[str]) -> Tuple[Path, str, Optional[Dict[str, str]]]:
+    """Hash a catalog file; parse its frontmatter only if the hash changed."""
+    data = path.read_bytes()
+    content_hash = hashlib.sha256(data).hexdigest()
+    if content_hash == known_hash:
+        return path, content_hash, None
+    return path, content_hash, parse_frontmatter(data.decode('utf-8', errors='ignore'))
+
+def load_plugin_manifest(plugin_path: Path) -> Optional[Dict[str, Any]]:
     """Load and parse plugin.json manifest."""
     manifest_path = plugin_path / ".claude-plugin" / "plugin.json"
     if not manifest_path.exists():
         return None
-    
+
     with open(manifest_path, 'r') as f:
         return json.load(f)
 
-def extract_commands_from_manifest(manifest: Dict[str, Any], plugin_name: str) -> List[Dict[str, Any]]:
-    """Extract command information from plugin manifest."""
-    commands = []
-    
-    # Get capabilities which describe commands
-    capabilities = manifest.get('capabilities', {})
-    
-    for cap_key, cap_data in capabilities.items():
-        if isinstance(cap_data, dict) and 'command' in cap_data:
-            cmd_name = cap_data['command']
-            commands.append({
-                'name': cmd_name,
-                'description': cap_data.get('description', ''),
-                'plugin': plugin_name,
-                'category': manifest.get('settings', {}).get('category', 'general'),
-                'capability_key': cap_key
-            })
-    
-    return commands
-
-def categorize_commands(commands: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-    """Group commands by plugin for organization."""
-    categorized = defaultdict(list)
-    
-    for cmd in commands:
-        plugin_name = cmd['plugin']
-        categorized[plugin_name].append(cmd)
-    
-    return dict(categorized)
-
-def generate_markdown(categorized_commands: Dict[str, List[Dict[str, Any]]], 
-                     plugin_info: Dict[str, Dict[str, Any]]) -> str:
-    """Generate markdown documentation from command data."""
-    
+def unchanged_since(cursor: sqlite3.Cursor, table: str, key_column: str, key: str,
+                    content_hash: str, now: str) -> str:
+    """Keep a row's updated_at when its content is unchanged (e.g. under --force)."""
+    row = cursor.execute(f"SELECT updated_at FROM {table} WHERE {key_column} = ? AND content_hash = ?",
+                         (key, content_hash)).fetchone()
+    return row[0] if row else now
+
+def update_catalog(conn: sqlite3.Connection, force: bool = False,
+                   jobs: Optional[int] = None) -> Dict[str, int]:
+    """Bring the catalog in line with the plugins tree.
+
+    Files are hashed in parallel; only files whose content hash differs from
+    the catalog are re-parsed and written. Entries for deleted files are
+    removed.
+    """
+    cursor = conn.cursor()
+    now = datetime.now().isoformat(timespec='seconds')
+    stats = {'plugins': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+
+    known_plugins = {row[0]: row[1] for row in cursor.execute(
+        "SELECT manifest_path, content_hash FROM plugins")}
+    known_entries = {row[0]: row[1] for row in cursor.execute(
+        "SELECT path, content_hash FROM entries")}
+
+    plugin_dirs = sorted(d for d in PLUGINS_DIR.iterdir() if d.is_dir() and not d.name.startswith('.'))
+    seen_plugins, seen_entries = set(), set()
+    work = []  # (plugin, kind, path)
+
+    for plugin_dir in plugin_dirs:
+        manifest_path = plugin_dir / ".claude-plugin" / "plugin.json"
+        if not manifest_path.exists():
+            print(f"⚠️  Skipping {plugin_dir.name} (no manifest)")
+            continue
+
+        stats['plugins'] += 1
+        seen_plugins.add(plugin_dir.name)
+        rel_manifest = str(manifest_path.relative_to(REPO_ROOT))
+        manifest_hash = hashlib.sha256(manifest_path.read_bytes()).hexdigest()
+        if force or known_plugins.get(rel_manifest) != manifest_hash:
+            manifest = load_plugin_manifest(plugin_dir)
+            cursor.execute("""
+                INSERT OR REPLACE INTO plugins (name, manifest_path, content_hash, version,
+                                                description, category, repository_url, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                plugin_dir.name,
+                rel_manifest,
+                manifest_hash,
+                manifest.get('version', 'Unknown'),
+                manifest.get('description', ''),
+                manifest.get('settings', {}).get('category', 'general'),
+                manifest.get('repository', {}).get('url', ''),
+                unchanged_since(cursor, 'plugins', 'manifest_path', rel_manifest, manifest_hash, now)
+            ))
+            stats['changed'] += 1
+
+        for kind, pattern in ENTRY_GLOBS.items():
+            for path in sorted(plugin_dir.glob(pattern)):
+                work.append((plugin_dir.name, kind, path))
+
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        results = pool.map(
+            lambda item: read_entry(item[2], None if force else
+                                    known_entries.get(str(item[2].relative_to(REPO_ROOT)))),
+            work)
+
+        for (plugin, kind, _), (path, content_hash, fields) in zip(work, results):
+            rel_path = str(path.relative_to(REPO_ROOT))
+            seen_entries.add(rel_path)
+            if fields is None:
+                stats['unchanged'] += 1
+                continue
+
+            default_name = path.parent.name if kind == 'skill' else path.stem
+            cursor.execute("""
+                INSERT OR REPLACE INTO entries (path, plugin, kind, name, description,
+                                                allowed_tools, argument_hint, content_hash,
+                                                updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                rel_path,
+                plugin,
+                kind,
+                default_name if kind == 'command' else fields.get('name', default_name),
+                fields.get('description', ''),
+                fields.get('allowed-tools', fields.get('tools', '')),
+                fields.get('argument-hint', ''),
+                content_hash,
+                unchanged_since(cursor, 'entries', 'path', rel_path, content_hash, now)
+            ))
+            stats['changed'] += 1
+
+    for path in set(known_entries) - seen_entries:
+        cursor.execute("DELETE FROM entries WHERE path = ?", (path,))
+        stats['removed'] += 1
+    for name in {row[0] for row in cursor.execute("SELECT name FROM plugins")} - seen_plugins:
+        cursor.execute("DELETE FROM plugins WHERE name = ?", (name,))
+        stats['removed'] += 1
+
+    conn.commit()
+    return stats
+
+def lookup(conn: sqlite3.Connection, term: str, kind: Optional[str] = None) -> List[tuple]:
+    """Find catalog entries whose name or description matches `term`."""
+    sql = """
+        SELECT kind, plugin, name, argument_hint, description, path
+        FROM entries
+        WHERE (name LIKE ? OR description LIKE ?)
+    """
+    params = [f"%{term}%", f"%{term}%"]
+    if kind:
+        sql += " AND kind = ?"
+        params.append(kind)
+    # Exact and prefix name matches first
+    sql += " ORDER BY name = ? DESC, name LIKE ? DESC, plugin, name"
+    params.extend([term, f"{term}%"])
+    return conn.execute(sql, params).fetchall()
+
+def load_catalog(conn: sqlite3.Connection) -> Tuple[Dict[str, Dict[str, Any]],
+                                                    Dict[str, Dict[str, List[Dict[str, Any]]]], str]:
+    """Load plugin info, entries grouped by plugin and kind, and last change date."""
+    conn.row_factory = sqlite3.Row
+    plugin_info = {row['name']: dict(row) for row in conn.execute("SELECT * FROM plugins")}
+    grouped = defaultdict(lambda: defaultdict(list))
+    for row in conn.execute("SELECT * FROM entries ORDER BY name"):
+        grouped[row['plugin']][row['kind']].append(dict(row))
+    last_change = conn.execute("""
+        SELECT MAX(updated_at) FROM (SELECT updated_at FROM entries
+                                     UNION ALL SELECT updated_at FROM plugins)
+    """).fetchone()[0] or ''
+    conn.row_factory = None
+    return plugin_info, grouped, last_change[:10]
+
+def generate_markdown(grouped: Dict[str, Dict[str, List[Dict[str, Any]]]],
+                     plugin_info: Dict[str, Dict[str, Any]], last_change: str) -> str:
+    """Generate markdown documentation from catalog data."""
+
     md = """# Commands Reference
 
 Complete reference for all commands across Claude Code plugins.
 
 ## Overview
 
-This reference is auto-generated from plugin manifests and provides comprehensive
-documentation for all available commands organized by plugin.
+This reference is auto-generated from the plugin catalog (command, agent and
+skill frontmatter) and documents everything available, organized by plugin.
 
 **Total Commands**: {total_commands} across {total_plugins} plugins
 
 ---
 
 """.format(
-        total_commands=sum(len(cmds) for cmds in categorized_commands.values()),
-        total_plugins=len(categorized_commands)
+        total_commands=sum(len(kinds.get('command', [])) for kinds in grouped.values()),
+        total_plugins=len(plugin_info)
     )
-    
+
     # Table of contents
     md += "## Quick Navigation\n\n"
-    for plugin_name in sorted(categorized_commands.keys()):
-        info = plugin_info.get(plugin_name, {})
-        cmd_count = len(categorized_commands[plugin_name])
+    for plugin_name in sorted(plugin_info.keys()):
+        info = plugin_info[plugin_name]
+        cmd_count = len(grouped[plugin_name].get('command', []))
         md += f"- [{plugin_name}](#{plugin_name.replace('-', '')}) ({cmd_count} commands) - {info.get('description', '')}\n"
-    
+
     md += "\n---\n\n"
-    
-    # Detailed command documentation
-    for plugin_name in sorted(categorized_commands.keys()):
-        info = plugin_info.get(plugin_name, {})
-        commands = categorized_commands[plugin_name]
-        
+
+    # Detailed documentation
+    for plugin_name in sorted(plugin_info.keys()):
+        info = plugin_info[plugin_name]
+        kinds = grouped[plugin_name]
+
         md += f"## {plugin_name}\n\n"
-        md += f"**Description**: {info.get('description', 'No description available')}\n\n"
+        md += f"**Description**: {info.get('description') or 'No description available'}\n\n"
         md += f"**Version**: {info.get('version', 'Unknown')}\n\n"
         md += f"**Category**: {info.get('category', 'general')}\n\n"
-        
-        if info.get('repository'):
-            repo_url = info['repository'].get('url', '')
-            if repo_url:
-                md += f"**Source**: [{repo_url}]({repo_url}/tree/main/plugins/{plugin_name})\n\n"
-        
-        md += "### Commands\n\n"
-        
-        for cmd in sorted(commands, key=lambda x: x['name']):
-            md += f"#### `/{cmd['name']}`\n\n"
-            md += f"{cmd['description']}\n\n"
-            md += f"**Plugin**: {plugin_name}\n\n"
-            
-            # Add link to plugin README for more details
-            md += f"**More Info**: See [plugin README](../../plugins/{plugin_name}/README.md)\n\n"
-            md += "---\n\n"
-    
+
+        repo_url = info.get('repository_url')
+        if repo_url:
+            md += f"**Source**: [{repo_url}]({repo_url}/tree/main/plugins/{plugin_name})\n\n"
+
+        if kinds.get('command'):
+            md += "### Commands\n\n"
+            for cmd in kinds['command']:
+                md += f"#### `/{cmd['name']}`\n\n"
+                md += f"{cmd['description']}\n\n"
+                if cmd['argument_hint']:
+                    md += f"**Arguments**: `{cmd['argument_hint']}`\n\n"
+                if cmd['allowed_tools']:
+                    md += f"**Allowed Tools**: {cmd['allowed_tools']}\n\n"
+                md += f"**Plugin**: {plugin_name}\n\n"
+
+                # Add link to plugin README for more details
+                md += f"**More Info**: See [plugin README](../../plugins/{plugin_name}/README.md)\n\n"
+                md += "---\n\n"
+
+        for kind, heading in (('agent', 'Agents'), ('skill', 'Skills')):
+            if kinds.get(kind):
+                md += f"### {heading}\n\n"
+                for entry in kinds[kind]:
+                    md += f"- **{entry['name']}** - {entry['description']}\n"
+                md += "\n"
+
     # Footer
     md += """
 ## Usage Notes
@@ -136,68 +333,68 @@ To enable/disable plugins and their commands, see the [installation guide](../ge
 
 ---
 
-**Auto-generated**: This reference is automatically generated from plugin manifests.
-**Last Updated**: {timestamp}
+**Auto-generated**: This reference is automatically generated from the plugin catalog.
+**Last Updated**: {last_change}
 **Generator**: scripts/generate-commands-reference.py
-""".format(timestamp=__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-    
+""".format(last_change=last_change)
+
     return md
 
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write `content` to `path` unless it already holds exactly that."""
+    if path.exists() and path.read_text() == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return True
+
 def main():
     """Main execution function."""
-    print("🔍 Scanning plugins...")
-    
-    # Find all plugin directories
-    plugin_dirs = [d for d in PLUGINS_DIR.iterdir() if d.is_dir() and not d.name.startswith('.')]
-    print(f"Found {len(plugin_dirs)} plugins")
-    
-    # Load all plugin manifests
-    all_commands = []
-    plugin_info = {}
-    
-    for plugin_dir in plugin_dirs:
-        plugin_name = plugin_dir.name
-        manifest = load_plugin_manifest(plugin_dir)
-        
-        if manifest is None:
-            print(f"⚠️  Skipping {plugin_name} (no manifest)")
-            continue
-        
-        print(f"✓ Processing {plugin_name}")
-        
-        # Store plugin info
-        plugin_info[plugin_name] = {
-            'name': manifest.get('name', plugin_name),
-            'version': manifest.get('version', 'Unknown'),
-            'description': manifest.get('description', ''),
-            'category': manifest.get('settings', {}).get('category', 'general'),
-            'repository': manifest.get('repository', {})
-        }
-        
-        # Extract commands
-        commands = extract_commands_from_manifest(manifest, plugin_name)
-        all_commands.extend(commands)
-        print(f"  Found {len(commands)} commands")
-    
-    print(f"\n📊 Total commands: {len(all_commands)}")
-    
-    # Categorize commands
-    categorized = categorize_commands(all_commands)
-    
+    parser = argparse.ArgumentParser(description="Plugin catalog and commands reference generator")
+    parser.add_argument("--force", action="store_true", help="Re-parse every file")
+    parser.add_argument("--jobs", type=int, help="Parallel file readers")
+    parser.add_argument("--lookup", metavar="TERM", help="Query the catalog instead of generating docs")
+    parser.add_argument("--kind", choices=sorted(ENTRY_GLOBS), help="Restrict --lookup to one kind")
+    args = parser.parse_args()
+
+    CATALOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CATALOG_PATH)
+    init_catalog(conn)
+
+    if not args.lookup:
+        print("🔍 Scanning plugins...")
+    result = update_catalog(conn, args.force, args.jobs)
+
+    if args.lookup:
+        rows = lookup(conn, args.lookup, args.kind)
+        for kind, plugin, name, hint, description, path in rows:
+            label = f"/{name}" if kind == 'command' else name
+            print(f"{kind:7} | {plugin:12} | {label} {hint}".rstrip())
+            print(f"        {description}")
+            print(f"        {path}")
+        if not rows:
+            print(f"No catalog entries match '{args.lookup}'")
+        conn.close()
+        return
+
+    print(f"Found {result['plugins']} plugins: {result['changed']} changed, "
+          f"{result['unchanged']} unchanged, {result['removed']} removed")
+
+    plugin_info, grouped, last_change = load_catalog(conn)
+    conn.close()
+
+    total = sum(len(kinds.get('command', [])) for kinds in grouped.values())
+    print(f"\n📊 Total commands: {total}")
+
     # Generate markdown
-    print("\n📝 Generating markdown...")
-    markdown = generate_markdown(categorized, plugin_info)
-    
-    # Ensure output directory exists
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Write output
-    with open(OUTPUT_FILE, 'w') as f:
-        f.write(markdown)
-    
-    print(f"✅ Commands reference generated: {OUTPUT_FILE}")
-    print(f"   {len(all_commands)} commands documented")
-    print(f"   {len(categorized)} plugins covered")
+    markdown = generate_markdown(grouped, plugin_info, last_change)
+
+    if write_if_changed(OUTPUT_FILE, markdown):
+        print(f"✅ Commands reference generated: {OUTPUT_FILE}")
+        print(f"   {total} commands documented")
+        print(f"   {len(plugin_info)} plugins covered")
+    else:
+        print(f"✅ Commands reference up to date: {OUTPUT_FILE}")
 
 if __name__ == '__main__':
     main()
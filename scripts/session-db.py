@@ -14,25 +14,61 @@ Use cases:
 
 Usage:
     ./session-db.py index              # Build/update index
+    ./session-db.py ingest --transcript f.jsonl  # Index new lines of one session (hooks)
     ./session-db.py search "query"     # Search across all sessions
     ./session-db.py search "query" --project ml4t  # Filter by project
     ./session-db.py timeline --days 2  # Recent activity
     ./session-db.py files "pattern"    # Find file changes
+    ./session-db.py slow --by command  # Slowest tool calls (p50/p95/max)
+    ./session-db.py context 1234       # Conversation around action #1234
+    ./session-db.py merge /srv/box1/.claude/session-index.db  # Merge a host's index
+    ./session-db.py archive --older-than 30d  # Compress cold sessions in place
+    ./session-db.py handoffs --latest  # Most recent .claude/transitions handoff
+    ./session-db.py memory-search "q"  # Search .claude/memory notes
+    ./session-db.py memory-freshness   # Rank stale memory notes
+    ./session-db.py export-columns     # Columnar snapshot for analytics (NumPy)
+    ./session-db.py analytics --days 365  # Heatmap, trends, session lengths
 """
 
+import gzip
+import io
 import json
+import lzma
+import math
+import os
+import shutil
+import socket
 import sqlite3
 import sys
+import time
 import re
+import shlex
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
 from pathlib import Path
 import argparse
 
 DB_PATH = Path.home() / ".claude/session-index.db"
 PROJECTS_DIR = Path.home() / ".claude/projects"
+COLUMNS_DIR = Path.home() / ".claude/session-columns"
+
+# Session files may be archived in place with any of these compressions
+COMPRESSED_SUFFIXES = (".gz", ".zst", ".xz")
+
+# Indexers lease session files in batches; a lease outlives a crashed run by
+# at most LEASE_SECONDS (sooner on the same host, where dead pids are detected)
+LEASE_SECONDS = 300
+CLAIM_BATCH = 50
+
+# ingest splits its budget: parsing may use a third, and the actions it
+# keeps are capped so inserting them (FTS triggers included) fits the rest
+INGEST_PARSE_SHARE = 1 / 3
+INGEST_ACTIONS_PER_MS = 4
 
 def init_db(conn):
     """Initialize database schema."""
+    # WAL lets searches read while an indexer writes
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS sessions (
             id INTEGER PRIMARY KEY,
@@ -42,7 +78,66 @@ def init_db(conn):
             first_ts TEXT,
             last_ts TEXT,
             action_count INTEGER,
-            indexed_at TEXT
+            indexed_at TEXT,
+            source_file TEXT,
+            host TEXT
+        );
+
+        -- Markdown artifacts (.claude/transitions handoffs, .claude/memory
+        -- notes), one row per heading section
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY,
+            project TEXT,
+            project_path TEXT,
+            kind TEXT,
+            path TEXT,
+            section INTEGER,
+            heading TEXT,
+            timestamp TEXT,
+            body TEXT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_documents_kind_ts
+            ON documents(project_path, kind, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_documents_path ON documents(path);
+
+        -- mtime of each indexed document, for incremental refresh
+        CREATE TABLE IF NOT EXISTS document_files (
+            path TEXT PRIMARY KEY,
+            project_path TEXT,
+            mtime REAL
+        );
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+            heading,
+            body,
+            content='documents',
+            content_rowid='id'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+            INSERT INTO documents_fts(rowid, heading, body)
+            VALUES (new.id, new.heading, new.body);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+            INSERT INTO documents_fts(documents_fts, rowid, heading, body)
+            VALUES('delete', old.id, old.heading, old.body);
+        END;
+
+        -- Session files currently being indexed (see claim_files)
+        CREATE TABLE IF NOT EXISTS index_leases (
+            session_file TEXT PRIMARY KEY,
+            owner TEXT,
+            expires_at REAL
+        );
+
+        -- Per-host watermark of the newest merged session (see merge_index)
+        CREATE TABLE IF NOT EXISTS merges (
+            host TEXT PRIMARY KEY,
+            source TEXT,
+            watermark TEXT,
+            merged_at TEXT
         );
 
         CREATE TABLE IF NOT EXISTS actions (
@@ -54,13 +149,25 @@ def init_db(conn):
             tool TEXT,
             action_type TEXT,
             detail TEXT,
+            tool_use_id TEXT,
+            duration_ms INTEGER,
+            byte_offset INTEGER,
             FOREIGN KEY (session_id) REFERENCES sessions(session_id)
         );
 
-        CREATE INDEX IF NOT EXISTS idx_actions_project ON actions(project);
         CREATE INDEX IF NOT EXISTS idx_actions_date ON actions(date);
-        CREATE INDEX IF NOT EXISTS idx_actions_tool ON actions(tool);
-        CREATE INDEX IF NOT EXISTS idx_actions_type ON actions(action_type);
+
+        -- Composite (filter, date) indexes serve structured search filters;
+        -- they supersede the single-column project/tool/type indexes
+        DROP INDEX IF EXISTS idx_actions_project;
+        DROP INDEX IF EXISTS idx_actions_tool;
+        DROP INDEX IF EXISTS idx_actions_type;
+        CREATE INDEX IF NOT EXISTS idx_actions_project_date
+            ON actions(project, date, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_actions_type_date
+            ON actions(action_type, date, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_actions_tool_date
+            ON actions(tool, date, timestamp);
 
         -- Full-text search on action details
         CREATE VIRTUAL TABLE IF NOT EXISTS actions_fts USING fts5(
@@ -79,6 +186,27 @@ def init_db(conn):
             VALUES('delete', old.id, old.detail);
         END;
     """)
+    migrate_db(conn)
+
+# Columns added after the original schema: (table, column, declaration)
+ADDED_COLUMNS = [
+    ("actions", "tool_use_id", "TEXT"),
+    ("actions", "duration_ms", "INTEGER"),
+    ("actions", "byte_offset", "INTEGER"),
+    ("sessions", "source_file", "TEXT"),
+    ("sessions", "host", "TEXT"),
+    ("sessions", "indexed_bytes", "INTEGER"),
+]
+
+def migrate_db(conn):
+    """Add columns introduced after the original schema to existing databases."""
+    existing = {}
+    for table, name, decl in ADDED_COLUMNS:
+        if table not in existing:
+            existing[table] = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if name not in existing[table]:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+    conn.commit()
 
 def extract_project_name(claude_dir_name: str) -> tuple:
     """Extract readable project name from Claude's directory format."""
@@ -89,14 +217,84 @@ def extract_project_name(claude_dir_name: str) -> tuple:
         parts = parts[2:]
     return "-".join(parts), "/" + claude_dir_name.lstrip("-").replace("-", "/")
 
-def parse_session(session_file: Path) -> list:
-    """Parse a session JSONL file into actions."""
+def open_session(session_file: Path):
+    """Open a session file for binary line iteration, decompressing as it streams."""
+    suffix = session_file.suffix
+    if suffix == ".gz":
+        return gzip.open(session_file, "rb")
+    if suffix == ".xz":
+        return lzma.open(session_file, "rb")
+    if suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError(f"{session_file.name}: reading .zst needs 'pip install zstandard'")
+        raw = open(session_file, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    return open(session_file, "rb")
+
+def session_id_for(session_file: Path) -> str:
+    """Session id from a file name, ignoring any archive suffix."""
+    name = session_file.name
+    if name.endswith(COMPRESSED_SUFFIXES):
+        name = name.rsplit(".", 1)[0]
+    return name[:-len(".jsonl")] if name.endswith(".jsonl") else name
+
+def session_files(project_dir: Path) -> list:
+    """Plain and archived session files; a plain file wins over its archive."""
+    files = {}
+    for candidate in project_dir.glob("*.jsonl*"):
+        if candidate.suffix != ".jsonl" and candidate.suffix not in COMPRESSED_SUFFIXES:
+            continue
+        session_id = session_id_for(candidate)
+        if session_id not in files or candidate.suffix == ".jsonl":
+            files[session_id] = candidate
+    return list(files.values())
+
+def parse_ts(ts_str: str) -> datetime:
+    """Parse a session timestamp (ISO 8601, possibly with a trailing Z)."""
+    return datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
+
+def parse_session(session_file: Path, start: int = 0, state: dict = None) -> list:
+    """Parse a session JSONL file into actions.
+
+    Each tool_use is paired with its tool_result (matched on tool_use_id) to
+    record the wall-clock duration of the call in ``duration_ms``, and each
+    action keeps the ``byte_offset`` of its source line for `context` lookups.
+    Offsets are into the decompressed stream, so they survive archiving.
+
+    Parsing begins at byte `start`. If `state` is given it receives
+    ``end_offset`` (just past the last complete line consumed) and
+    ``unmatched_results`` (tool_use_id -> timestamp of results whose tool_use
+    came before `start`); a ``deadline`` in it (time.monotonic() value) or
+    ``max_actions`` stops parsing early at a line boundary and sets
+    ``stopped_early``.
+    """
     actions = []
-
-    with open(session_file, errors='ignore') as f:
-        for line in f:
+    pending = {}  # tool_use_id -> action awaiting its tool_result
+    unmatched = {}
+    deadline = state.get("deadline") if state else None
+    max_actions = state.get("max_actions") if state else None
+    offset = start
+
+    with open_session(session_file) as f:
+        if start:
+            f.seek(start)
+        for line_number, line in enumerate(f):
+            if (deadline and line_number % 256 == 0 and time.monotonic() > deadline) \
+                    or (max_actions and len(actions) >= max_actions):
+                state["stopped_early"] = True
+                break
+            line_offset = offset
+            try:
+                msg = json.loads(line.decode(errors="ignore"))
+            except ValueError:
+                if not line.endswith(b"\n"):
+                    break  # line still being written; resume here next time
+                offset += len(line)
+                continue
+            offset += len(line)
             try:
-                msg = json.loads(line)
                 ts_str = msg.get("timestamp")
                 if not ts_str:
                     continue
@@ -106,6 +304,15 @@ def parse_session(session_file: Path) -> list:
                     continue
 
                 for item in content:
+                    if item.get("type") == "tool_result":
+                        action = pending.pop(item.get("tool_use_id"), None)
+                        if action:
+                            elapsed = parse_ts(ts_str) - parse_ts(action["timestamp"])
+                            action["duration_ms"] = max(0, int(elapsed.total_seconds() * 1000))
+                        elif item.get("tool_use_id"):
+                            unmatched[item["tool_use_id"]] = ts_str
+                        continue
+
                     if item.get("type") != "tool_use":
                         continue
 
@@ -116,6 +323,9 @@ def parse_session(session_file: Path) -> list:
                         "timestamp": ts_str,
                         "date": ts_str[:10],
                         "tool": tool_name,
+                        "tool_use_id": item.get("id"),
+                        "duration_ms": None,
+                        "byte_offset": line_offset,
                     }
 
                     if tool_name == "Bash":
@@ -143,20 +353,170 @@ def parse_session(session_file: Path) -> list:
                         action["action_type"] = "other"
 
                     actions.append(action)
+                    if action["tool_use_id"]:
+                        pending[action["tool_use_id"]] = action
             except:
                 continue
 
+    if state is not None:
+        state["end_offset"] = offset
+        state["unmatched_results"] = unmatched
     return actions
 
-def index_sessions(conn, force=False, project_filter=None):
-    """Index all sessions into the database."""
+def insert_actions(cursor, session_id: str, project_name: str, actions: list):
+    """Insert parsed actions for a session."""
+    cursor.executemany("""
+        INSERT INTO actions (session_id, project, timestamp, date,
+                            tool, action_type, detail,
+                            tool_use_id, duration_ms, byte_offset)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(
+        session_id,
+        project_name,
+        action["timestamp"],
+        action["date"],
+        action["tool"],
+        action["action_type"],
+        action["detail"],
+        action["tool_use_id"],
+        action["duration_ms"],
+        action["byte_offset"]
+    ) for action in actions])
+
+def lease_owner() -> str:
+    """Identify this indexer process in index_leases."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def owner_alive(owner: str) -> bool:
+    """Whether a lease owner may still be running (only checkable on this host)."""
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+
+def claim_files(conn, paths: list, owner: str) -> set:
+    """Lease session files to `owner`; returns the paths it now holds.
+
+    Leases of other live indexers are left alone. Expired leases and those
+    of dead processes on this host (crashed runs) are recovered first.
+    """
+    now = time.time()
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT owner FROM index_leases")
+    dead = [row[0] for row in cursor.fetchall() if not owner_alive(row[0])]
+    cursor.execute(f"""
+        DELETE FROM index_leases
+        WHERE expires_at < ? OR owner IN ({",".join("?" * len(dead))})
+    """, (now, *dead))
+
+    claimed = set()
+    for path in paths:
+        cursor.execute("""
+            INSERT OR IGNORE INTO index_leases (session_file, owner, expires_at)
+            VALUES (?, ?, ?)
+        """, (path, owner, now + LEASE_SECONDS))
+        if cursor.rowcount:
+            claimed.add(path)
+    conn.commit()
+    return claimed
+
+def release_files(cursor, paths: list, owner: str):
+    """Drop this indexer's leases (call inside the transaction that writes them)."""
+    cursor.executemany("DELETE FROM index_leases WHERE session_file = ? AND owner = ?",
+                       [(path, owner) for path in paths])
+
+def index_batch(conn, batch: list, owner: str, force: bool, stats: dict):
+    """Parse a batch of leased session files and write them in one transaction."""
+    cursor = conn.cursor()
+
+    # Another indexer may have finished some of these since the scan
+    cursor.execute(f"""
+        SELECT session_id, indexed_at FROM sessions
+        WHERE session_id IN ({",".join("?" * len(batch))})
+    """, [item["session_id"] for item in batch])
+    indexed = dict(cursor.fetchall())
+
+    parsed = []
+    for item in batch:
+        if not force and indexed.get(item["session_id"], "") >= item["mtime"]:
+            stats["skipped"] += 1
+            continue
+        state = {}
+        try:
+            actions = parse_session(item["file"], state=state)
+        except RuntimeError as e:
+            print(f"⚠️  Skipping {e}")
+            continue
+        parsed.append((item, actions, state["end_offset"]))
+
+    # Renew leases before writing; a file whose lease expired during a slow
+    # parse and was taken over by another indexer is left to that indexer
+    expires_at = time.time() + LEASE_SECONDS
+    for item, actions, end_offset in parsed:
+        session_id = item["session_id"]
+        cursor.execute("""
+            UPDATE index_leases SET expires_at = ?
+            WHERE session_file = ? AND owner = ?
+        """, (expires_at, str(item["file"]), owner))
+        if not cursor.rowcount:
+            stats["skipped"] += 1
+            continue
+
+        # Replace any existing copy, including one written since the SELECT above
+        cursor.execute("DELETE FROM actions WHERE session_id = ?", (session_id,))
+        cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        if session_id in indexed:
+            stats["updated"] += 1
+        else:
+            stats["new"] += 1
+
+        # Insert session metadata (empty sessions too, so they are not re-parsed)
+        cursor.execute("""
+            INSERT INTO sessions (session_id, project, project_path,
+                                 first_ts, last_ts, action_count, indexed_at,
+                                 source_file, indexed_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            session_id,
+            item["project_name"],
+            item["project_path"],
+            actions[0]["timestamp"] if actions else None,
+            actions[-1]["timestamp"] if actions else None,
+            len(actions),
+            datetime.now().isoformat(),
+            str(item["file"]),
+            end_offset
+        ))
+
+        insert_actions(cursor, session_id, item["project_name"], actions)
+        stats["actions"] += len(actions)
+
+    release_files(cursor, [str(item["file"]) for item in batch], owner)
+    conn.commit()
+
+def index_sessions(conn, force=False, project_filter=None, wait=False):
+    """Index all sessions into the database.
+
+    Stale session files are claimed in batches through `index_leases`, so
+    concurrent indexers (cron, hooks, several terminals) split the work
+    instead of parsing the same files, and each batch is written in one
+    short transaction. Files leased by another indexer are left to it and
+    counted as ``busy``, unless `wait` is set.
+    """
     cursor = conn.cursor()
 
     # Get already indexed sessions
     cursor.execute("SELECT session_id, indexed_at FROM sessions")
     indexed = {row[0]: row[1] for row in cursor.fetchall()}
 
-    stats = {"new": 0, "updated": 0, "skipped": 0, "actions": 0}
+    stats = {"new": 0, "updated": 0, "skipped": 0, "actions": 0, "busy": 0}
+    stale = []
 
     for project_dir in PROJECTS_DIR.iterdir():
         if not project_dir.is_dir():
@@ -168,8 +528,8 @@ def index_sessions(conn, force=False, project_filter=None):
         if project_filter and project_filter.lower() not in project_name.lower():
             continue
 
-        for session_file in project_dir.glob("*.jsonl"):
-            session_id = session_file.stem
+        for session_file in session_files(project_dir):
+            session_id = session_id_for(session_file)
             file_mtime = datetime.fromtimestamp(session_file.stat().st_mtime).isoformat()
 
             # Skip if already indexed and file hasn't changed
@@ -178,84 +538,441 @@ def index_sessions(conn, force=False, project_filter=None):
                     stats["skipped"] += 1
                     continue
 
-            # Parse session
-            actions = parse_session(session_file)
-            if not actions:
-                continue
+            stale.append({
+                "file": session_file,
+                "session_id": session_id,
+                "project_name": project_name,
+                "project_path": project_path,
+                "mtime": file_mtime,
+            })
+
+    owner = lease_owner()
+    while stale:
+        busy = []
+        for i in range(0, len(stale), CLAIM_BATCH):
+            batch = stale[i:i + CLAIM_BATCH]
+            claimed = claim_files(conn, [str(item["file"]) for item in batch], owner)
+            busy += [item for item in batch if str(item["file"]) not in claimed]
+            mine = [item for item in batch if str(item["file"]) in claimed]
+            if mine:
+                index_batch(conn, mine, owner, force, stats)
+        stats["busy"] = len(busy)
+        if not busy or not wait:
+            break
+        # Retry once the other indexer releases them; most will be fresh by then
+        time.sleep(1)
+        stale = busy
 
-            # Delete old data if updating
-            if session_id in indexed:
-                cursor.execute("DELETE FROM actions WHERE session_id = ?", (session_id,))
-                cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
-                stats["updated"] += 1
-            else:
-                stats["new"] += 1
+    return stats
 
-            # Insert session metadata
-            cursor.execute("""
-                INSERT INTO sessions (session_id, project, project_path,
-                                     first_ts, last_ts, action_count, indexed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                session_id,
-                project_name,
-                project_path,
-                actions[0]["timestamp"],
-                actions[-1]["timestamp"],
-                len(actions),
-                datetime.now().isoformat()
-            ))
-
-            # Insert actions
-            for action in actions:
+def ingest_transcript(conn, transcript: Path, budget_ms: int = 500) -> dict:
+    """Index only the lines appended to one session file since the last run.
+
+    Meant for Stop/PreCompact hooks: resumes from the session's stored
+    ``indexed_bytes`` and stops at a line boundary early enough that parsing
+    and writing together fit `budget_ms`; the rest is picked up next run.
+    Results whose tool_use was indexed earlier fill in that action's duration.
+    """
+    deadline = time.monotonic() + budget_ms * INGEST_PARSE_SHARE / 1000
+    max_actions = max(1, int(budget_ms * INGEST_ACTIONS_PER_MS))
+    cursor = conn.cursor()
+    session_id = session_id_for(transcript)
+    owner = lease_owner()
+    if str(transcript) not in claim_files(conn, [str(transcript)], owner):
+        # A full index is parsing this file right now
+        return {"session_id": session_id, "actions": 0, "complete": False, "busy": True}
+    project_name, project_path = extract_project_name(transcript.parent.name)
+
+    cursor.execute("SELECT indexed_bytes FROM sessions WHERE session_id = ?", (session_id,))
+    row = cursor.fetchone()
+    start = row[0] if row and row[0] is not None else 0
+    size = transcript.stat().st_size
+    if row and (row[0] is None or size < start):
+        # Indexed before offsets were tracked, or the file was rewritten
+        cursor.execute("DELETE FROM actions WHERE session_id = ?", (session_id,))
+        cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        row, start = None, 0
+    if row and size == start:
+        release_files(cursor, [str(transcript)], owner)
+        conn.commit()
+        return {"session_id": session_id, "actions": 0, "complete": True}
+
+    state = {"deadline": deadline, "max_actions": max_actions}
+    actions = parse_session(transcript, start, state)
+    complete = not state.get("stopped_early")
+
+    for tool_use_id, result_ts in state["unmatched_results"].items():
+        cursor.execute("""
+            UPDATE actions
+            SET duration_ms = MAX(0, CAST((julianday(?) - julianday(timestamp)) * 86400000 AS INTEGER))
+            WHERE session_id = ? AND tool_use_id = ? AND duration_ms IS NULL
+        """, (result_ts, session_id, tool_use_id))
+
+    # A partial run leaves indexed_at empty so a full `index` re-parses the session
+    indexed_at = datetime.now().isoformat() if complete else ""
+    if row:
+        cursor.execute("""
+            UPDATE sessions
+            SET first_ts = COALESCE(first_ts, ?), last_ts = COALESCE(?, last_ts),
+                action_count = action_count + ?,
+                indexed_at = ?, indexed_bytes = ?, source_file = ?
+            WHERE session_id = ?
+        """, (actions[0]["timestamp"] if actions else None,
+              actions[-1]["timestamp"] if actions else None, len(actions), indexed_at,
+              state["end_offset"], str(transcript), session_id))
+    else:
+        cursor.execute("""
+            INSERT INTO sessions (session_id, project, project_path, first_ts, last_ts,
+                                  action_count, indexed_at, source_file, indexed_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (session_id, project_name, project_path,
+              actions[0]["timestamp"] if actions else None,
+              actions[-1]["timestamp"] if actions else None,
+              len(actions), indexed_at, str(transcript), state["end_offset"]))
+
+    insert_actions(cursor, session_id, project_name, actions)
+    release_files(cursor, [str(transcript)], owner)
+    conn.commit()
+    return {"session_id": session_id, "actions": len(actions), "complete": complete}
+
+def split_sections(text: str) -> list:
+    """Split markdown into (heading, body) sections at headings outside code fences."""
+    sections = []
+    heading, lines, in_fence = "", [], False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and line.startswith("#"):
+            if heading or any(text_line.strip() for text_line in lines):
+                sections.append((heading, "\n".join(lines).strip()))
+            heading, lines = line.lstrip("#").strip(), []
+        else:
+            lines.append(line)
+    if heading or any(text_line.strip() for text_line in lines):
+        sections.append((heading, "\n".join(lines).strip()))
+    return sections
+
+def document_timestamp(path: Path, kind: str, mtime: float) -> str:
+    """Handoffs carry their UTC time in the path (YYYY-MM-DD/HHMMSS.md)."""
+    if kind == "handoff" and re.fullmatch(r"\d{6}", path.stem) \
+            and re.fullmatch(r"\d{4}-\d{2}-\d{2}", path.parent.name):
+        t = path.stem
+        return f"{path.parent.name}T{t[:2]}:{t[2:4]}:{t[4:]}Z"
+    return datetime.fromtimestamp(mtime).isoformat(timespec="seconds")
+
+def project_roots() -> list:
+    """Project directories on this machine that have sessions indexed."""
+    roots = []
+    for project_dir in PROJECTS_DIR.iterdir() if PROJECTS_DIR.exists() else []:
+        _, project_path = extract_project_name(project_dir.name)
+        # The path is reconstructed from a dash-joined name; skip guesses that don't exist
+        if project_dir.is_dir() and Path(project_path, ".claude").is_dir():
+            roots.append(Path(project_path))
+    return roots
+
+def index_documents(conn, roots: list, force: bool = False) -> dict:
+    """Index .claude/transitions and .claude/memory markdown under each root.
+
+    Files are re-split only when their mtime changed; rows for deleted
+    files are dropped.
+    """
+    cursor = conn.cursor()
+    stats = {"indexed": 0, "skipped": 0, "removed": 0}
+
+    for root in roots:
+        root = Path(root).resolve()
+        project_name, _ = extract_project_name("-" + str(root).lstrip("/").replace("/", "-"))
+        cursor.execute("SELECT path, mtime FROM document_files WHERE project_path = ?",
+                       (str(root),))
+        known = dict(cursor.fetchall())
+
+        found = [(path, "handoff") for path in root.glob(".claude/transitions/*/*.md")]
+        found += [(path, "memory") for path in root.glob(".claude/memory/**/*.md")]
+
+        seen = set()
+        for path, kind in found:
+            mtime = path.stat().st_mtime
+            seen.add(str(path))
+            if not force and known.get(str(path)) == mtime:
+                stats["skipped"] += 1
+                continue
+
+            cursor.execute("DELETE FROM documents WHERE path = ?", (str(path),))
+            timestamp = document_timestamp(path, kind, mtime)
+            text = path.read_text(errors="ignore")
+            for section, (heading, body) in enumerate(split_sections(text)):
                 cursor.execute("""
-                    INSERT INTO actions (session_id, project, timestamp, date,
-                                        tool, action_type, detail)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    session_id,
-                    project_name,
-                    action["timestamp"],
-                    action["date"],
-                    action["tool"],
-                    action["action_type"],
-                    action["detail"]
-                ))
-                stats["actions"] += 1
+                    INSERT INTO documents (project, project_path, kind, path,
+                                           section, heading, timestamp, body)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (project_name, str(root), kind, str(path), section, heading,
+                      timestamp, body))
+            cursor.execute("INSERT OR REPLACE INTO document_files (path, project_path, mtime) "
+                           "VALUES (?, ?, ?)", (str(path), str(root), mtime))
+            stats["indexed"] += 1
+
+        for path in set(known) - seen:
+            cursor.execute("DELETE FROM documents WHERE path = ?", (path,))
+            cursor.execute("DELETE FROM document_files WHERE path = ?", (path,))
+            stats["removed"] += 1
 
     conn.commit()
     return stats
 
-def search(conn, query: str, project: str = None, days: int = None, limit: int = 50):
-    """Search actions using full-text search."""
-    cursor = conn.cursor()
+def handoffs(conn, root: Path = None, query: str = None, limit: int = 10):
+    """Handoff documents, newest first; optionally only those matching `query`."""
+    sql = """
+        SELECT d.path, d.timestamp, d.project, COUNT(*) as sections
+        FROM documents d
+    """
+    where, params = ["d.kind = 'handoff'"], []
+    if query:
+        sql += " JOIN documents_fts fts ON d.id = fts.rowid"
+        where.append("documents_fts MATCH ?")
+        params.append('"' + query.replace('"', '""') + '"')
+    if root:
+        where.append("d.project_path = ?")
+        params.append(str(root))
+    sql += " WHERE " + " AND ".join(where)
+    sql += " GROUP BY d.path ORDER BY d.timestamp DESC LIMIT ?"
+    params.append(limit)
+    return conn.execute(sql, params).fetchall()
 
-    # Escape special FTS5 characters and wrap in quotes for literal search
-    safe_query = '"' + query.replace('"', '""') + '"'
+def document_sections(conn, path: str) -> list:
+    """All (heading, body) sections of one indexed document, in order."""
+    return conn.execute("SELECT heading, body FROM documents WHERE path = ? ORDER BY section",
+                        (path,)).fetchall()
 
+def memory_search(conn, query: str, root: Path = None, limit: int = 20):
+    """Full-text search over memory note sections, best matches first."""
     sql = """
-        SELECT a.date, a.timestamp, a.project, a.tool, a.action_type, a.detail
-        FROM actions a
-        JOIN actions_fts fts ON a.id = fts.rowid
-        WHERE actions_fts MATCH ?
+        SELECT d.path, d.heading, d.timestamp,
+               snippet(documents_fts, 1, '[', ']', '...', 12)
+        FROM documents_fts
+        JOIN documents d ON d.id = documents_fts.rowid
+        WHERE documents_fts MATCH ? AND d.kind = 'memory'
     """
-    params = [safe_query]
-
+    # Terms are ANDed, each matched literally
+    params = [" ".join('"' + t.replace('"', '""') + '"' for t in query.split())]
+    if root:
+        sql += " AND d.project_path = ?"
+        params.append(str(root))
+    sql += " ORDER BY bm25(documents_fts) LIMIT ?"
+    params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+VALIDATED_RE = re.compile(r"Last (?:validated|updated)\W*.*?(\d{4}-\d{2}-\d{2})", re.IGNORECASE)
+CODE_SPAN_RE = re.compile(r"`([^`\n]+)`")
+BARE_PATH_RE = re.compile(r"(?<![\w/`])(/?(?:[\w.-]+/)+[\w.-]+\.\w{1,6})\b")
+SYMBOL_RE = re.compile(r"^[A-Za-z_][\w.]*(?:\(\))?$")
+
+# A slash-less code span is a file only with one of these extensions;
+# otherwise `os.path` or `self.config` would be cross-checked as files
+FILE_EXTENSIONS = {
+    "py", "pyi", "ipynb", "md", "txt", "rst", "json", "jsonl", "yaml", "yml",
+    "toml", "ini", "cfg", "env", "lock", "sh", "bash", "zsh", "js", "mjs",
+    "cjs", "ts", "tsx", "jsx", "css", "scss", "html", "sql", "csv", "rs",
+    "go", "java", "kt", "rb", "c", "h", "cpp", "hpp", "swift",
+}
+
+def note_references(text: str, root: Path = None) -> tuple:
+    """File paths and code symbols a memory note mentions.
+
+    Paths are made relative to `root` when they point inside it, matching
+    how memory_freshness keys changed files.
+    """
+    prefix = f"{root}/" if root else None
+
+    def as_ref(path: str) -> str:
+        path = path.removeprefix("./")
+        if prefix and path.startswith(prefix):
+            return path[len(prefix):]
+        return path
+
+    paths, symbols = set(), set()
+    for span in CODE_SPAN_RE.findall(text):
+        span = span.strip()
+        if "://" in span or " " in span:
+            continue
+        _, dot, ext = span.rpartition(".")
+        if "/" in span or (dot and ext.lower() in FILE_EXTENSIONS):
+            paths.add(as_ref(span))
+        elif SYMBOL_RE.match(span):
+            symbols.add(span.rstrip("()"))
+    # Bare paths in prose (code spans and URLs were handled or skipped above)
+    prose = re.sub(r"\S+://\S+", " ", CODE_SPAN_RE.sub(" ", text))
+    for match in BARE_PATH_RE.findall(prose):
+        paths.add(as_ref(match))
+    return sorted(paths), sorted(symbols)
+
+def memory_freshness(conn, root: Path, max_age_days: int = 30) -> list:
+    """Rank .claude/memory notes by staleness in one pass.
+
+    A note is stale when a file it references was changed (per indexed
+    Write/Edit events) after the note's "Last validated/updated" date, when
+    that date is older than `max_age_days`, or when it has no date at all.
+    """
+    root = Path(root).resolve()
+    project_name, _ = extract_project_name("-" + str(root).lstrip("/").replace("/", "-"))
+
+    # Latest change per file for this project, keyed by path relative to root
+    last_changed = {}
+    for detail, ts in conn.execute("""
+        SELECT detail, MAX(timestamp) FROM actions
+        WHERE project = ? AND action_type = 'file_change'
+        GROUP BY detail
+    """, (project_name,)):
+        rel = detail[len(str(root)) + 1:] if detail.startswith(str(root) + "/") else detail
+        last_changed[rel] = max(ts, last_changed.get(rel, ""))
+
+    def changed_at(ref: str):
+        if ref in last_changed:
+            return last_changed[ref]
+        hits = [ts for path, ts in last_changed.items() if path.endswith("/" + ref)]
+        return max(hits) if hits else None
+
+    today = datetime.now().date()
+    results = []
+    for note in sorted(root.glob(".claude/memory/**/*.md")):
+        text = note.read_text(errors="ignore")
+        dates = VALIDATED_RE.findall(text)
+        validated = dates[-1] if dates else None
+        paths, symbols = note_references(text, root)
+
+        changed = []
+        for ref in paths:
+            ts = changed_at(ref)
+            # Same-day edits are ambiguous (validated after?), so count only later days
+            if ts and (validated is None or ts[:10] > validated):
+                changed.append((ref, ts[:10]))
+
+        age = (today - datetime.strptime(validated, "%Y-%m-%d").date()).days if validated else None
+        if changed:
+            status = "stale-refs"
+        elif validated is None:
+            status = "no-date"
+        elif age > max_age_days:
+            status = "old"
+        else:
+            status = "fresh"
+
+        results.append({
+            "file": str(note.relative_to(root)),
+            "validated": validated,
+            "age_days": age,
+            "status": status,
+            "changed_refs": changed,
+            "paths": paths,
+            "symbols": symbols,
+        })
+
+    rank = {"stale-refs": 0, "no-date": 1, "old": 2, "fresh": 3}
+    results.sort(key=lambda r: (rank[r["status"]], -len(r["changed_refs"]),
+                                -(r["age_days"] if r["age_days"] is not None else 10**6)))
+    return results
+
+# Structured query keys: key -> (column, operator)
+QUERY_FILTERS = {
+    "tool": ("a.tool", "="),
+    "type": ("a.action_type", "="),
+    "project": ("a.project", "prefix"),
+    "session": ("a.session_id", "="),
+    "after": ("a.date", ">="),
+    "before": ("a.date", "<"),
+}
+
+def parse_query(query: str) -> tuple:
+    """Split a search query into FTS terms and key:value filters.
+
+    Example: tool:Bash project:ml4t after:2026-01-01 type:file_change "pytest -x"
+    Unknown keys are treated as plain search text.
+    """
+    try:
+        tokens = shlex.split(query)
+    except ValueError:  # unbalanced quotes
+        tokens = query.split()
+
+    terms, filters = [], []
+    for token in tokens:
+        key, sep, value = token.partition(":")
+        if sep and key.lower() in QUERY_FILTERS and value:
+            filters.append((key.lower(), value))
+        else:
+            terms.append(token)
+    return terms, filters
+
+def resolve_date(value: str) -> str:
+    """Accept YYYY-MM-DD or a relative 'Nd' (N days ago)."""
+    match = re.fullmatch(r"(\d+)d", value)
+    if match:
+        return (datetime.now() - timedelta(days=int(match.group(1)))).strftime("%Y-%m-%d")
+    return value
+
+def compile_search(query: str, project: str = None, days: int = None,
+                   limit: int = 50) -> tuple:
+    """Compile a structured query into one parameterized SQL statement.
+
+    Filters become range/equality predicates that the composite
+    (column, date) indexes can serve. The `project:` token matches by
+    case-sensitive prefix (`project:*text` falls back to an unindexed
+    substring match); `--project` stays a case-insensitive substring match,
+    like `timeline` and `slow`.
+    """
+    terms, filters = parse_query(query)
     if project:
-        sql += " AND a.project LIKE ?"
-        params.append(f"%{project}%")
-
+        filters.append(("project", "*" + project))
     if days:
-        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        sql += " AND a.date >= ?"
-        params.append(since)
+        filters.append(("after", f"{days}d"))
+
+    where, params = [], []
+    for key, value in filters:
+        column, op = QUERY_FILTERS[key]
+        if key in ("after", "before"):
+            value = resolve_date(value)
+        if op == "prefix" and value.startswith("*"):
+            where.append(f"{column} LIKE ?")
+            params.append(f"%{value.lstrip('*')}%")
+        elif op == "prefix":
+            # Half-open range keeps the predicate sargable
+            where.append(f"{column} >= ? AND {column} < ?")
+            params.extend([value, value[:-1] + chr(ord(value[-1]) + 1)])
+        else:
+            where.append(f"{column} {op} ?")
+            params.append(value)
 
-    sql += " ORDER BY a.timestamp DESC LIMIT ?"
+    sql = """
+        SELECT a.id, a.date, a.timestamp, a.project, a.tool, a.action_type, a.detail
+        FROM actions a
+    """
+    if terms:
+        # Each term is quoted so FTS5 treats it literally; terms are ANDed
+        fts_query = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+        sql += " JOIN actions_fts fts ON a.id = fts.rowid"
+        where.insert(0, "actions_fts MATCH ?")
+        params.insert(0, fts_query)
+
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # date is timestamp[:10], so this is timestamp order that the
+    # (filter, date, timestamp) indexes can return without a sort
+    sql += " ORDER BY a.date DESC, a.timestamp DESC LIMIT ?"
     params.append(limit)
+    return sql, params
 
+def search(conn, query: str, project: str = None, days: int = None, limit: int = 50):
+    """Search actions using full-text search plus structured filters."""
+    sql, params = compile_search(query, project, days, limit)
+    cursor = conn.cursor()
     cursor.execute(sql, params)
     return cursor.fetchall()
 
+def explain_search(conn, query: str, project: str = None, days: int = None,
+                   limit: int = 50) -> tuple:
+    """Return the compiled SQL, its parameters and SQLite's query plan."""
+    sql, params = compile_search(query, project, days, limit)
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    return sql, params, plan
+
 def timeline(conn, days: int = 2, project: str = None):
     """Show timeline of recent activity."""
     cursor = conn.cursor()
@@ -299,6 +1016,537 @@ def file_changes(conn, pattern: str = None, days: int = 7, limit: int = 50):
     cursor.execute(sql, params)
     return cursor.fetchall()
 
+# Tools whose first argument is a subcommand worth keeping in the pattern
+MULTI_VERB_COMMANDS = {"git", "npm", "pnpm", "yarn", "uv", "cargo", "docker",
+                       "go", "make", "pip", "poetry", "gh", "kubectl"}
+
+# Setup steps skipped when picking the segment of a chained command to time
+SETUP_COMMANDS = {"cd", "pushd", "popd", "source", ".", "export", "set", "unset"}
+
+def command_pattern(command: str) -> str:
+    """Reduce a Bash command to a groupable pattern (e.g. 'git commit', 'pytest').
+
+    Chains split on &&, ||, ; and | are named after their first segment
+    that is not a setup step (cd, source, export, ...), ignoring env
+    assignments: `cd x && pytest -x && echo done` is 'pytest'.
+    """
+    segments = [[w for w in segment.split() if not re.match(r"^\w+=", w)]
+                for segment in re.split(r"&&|\|\||;|\|", command)]
+    segments = [words for words in segments if words]
+    words = next((words for words in segments if Path(words[0]).name not in SETUP_COMMANDS),
+                 segments[0] if segments else [])
+    if not words:
+        return command[:30]
+
+    head = Path(words[0]).name
+    if head in ("uv", "poetry") and words[1:2] == ["run"]:
+        return command_pattern(" ".join(words[2:])) if len(words) > 2 else head
+    if head.startswith("python") and words[1:2] == ["-m"] and len(words) > 2:
+        return words[2]
+    if head in MULTI_VERB_COMMANDS and len(words) > 1 and not words[1].startswith("-"):
+        return f"{head} {words[1]}"
+    return head
+
+def percentile(sorted_values: list, pct: float) -> int:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def slow(conn, by: str = "command", days: int = None, project: str = None,
+         limit: int = 20):
+    """Tool-call latency (p50/p95/max) grouped by command pattern, tool or project."""
+    cursor = conn.cursor()
+
+    sql = """
+        SELECT tool, project, detail, duration_ms
+        FROM actions
+        WHERE duration_ms IS NOT NULL
+    """
+    params = []
+
+    if by == "command":
+        sql += " AND tool = 'Bash'"
+
+    if project:
+        sql += " AND project LIKE ?"
+        params.append(f"%{project}%")
+
+    if days:
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        sql += " AND date >= ?"
+        params.append(since)
+
+    groups = defaultdict(list)
+    for tool, proj, detail, duration_ms in cursor.execute(sql, params):
+        if by == "command":
+            key = command_pattern(detail)
+        elif by == "project":
+            key = proj
+        else:
+            key = tool
+        groups[key].append(duration_ms)
+
+    results = []
+    for key, durations in groups.items():
+        durations.sort()
+        results.append((
+            key,
+            len(durations),
+            percentile(durations, 50),
+            percentile(durations, 95),
+            durations[-1],
+            sum(durations),
+        ))
+
+    # Rank by p95 so consistently slow work floats above one-off outliers
+    results.sort(key=lambda r: (r[3], r[4]), reverse=True)
+    return results[:limit]
+
+def read_lines_before(f, offset: int, count: int, block_size: int = 65536) -> list:
+    """Return up to `count` complete lines ending just before `offset`."""
+    if count <= 0 or offset <= 0:
+        return []
+
+    data = b""
+    pos = offset
+    # Read backwards until we have count + 1 newlines (or hit the file start)
+    while pos > 0 and data.count(b"\n") <= count:
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+
+    lines = data.split(b"\n")[:-1]  # data ends at offset, on a line boundary
+    if pos > 0:
+        lines = lines[1:]  # first piece may be a partial line
+    return lines[-count:]
+
+def describe_message(msg: dict, width: int = 200) -> list:
+    """Summarize one session JSONL record as short display lines."""
+    if msg.get("type") == "summary":
+        return [f"summary     | {msg.get('summary', '')[:width]}"]
+
+    role = msg.get("message", {}).get("role") or msg.get("type", "?")
+    content = msg.get("message", {}).get("content", "")
+    if isinstance(content, str):
+        return [f"{role:11} | {' '.join(content.split())[:width]}"]
+
+    described = []
+    for item in content if isinstance(content, list) else []:
+        kind = item.get("type")
+        if kind == "text":
+            text = " ".join(item.get("text", "").split())
+            described.append(f"{role:11} | {text[:width]}")
+        elif kind == "tool_use":
+            tool_input = json.dumps(item.get("input", {}))
+            described.append(f"tool_use    | {item.get('name', '')}: {tool_input[:width]}")
+        elif kind == "tool_result":
+            result = item.get("content", "")
+            if isinstance(result, list):
+                result = " ".join(r.get("text", "") for r in result if isinstance(r, dict))
+            result = " ".join(str(result).split())
+            described.append(f"tool_result | {result[:width]}")
+    return described
+
+def context(conn, action_id: int, before: int = 5, after: int = 5):
+    """Decode the raw session lines around an action via its stored byte offset.
+
+    Returns None for an unknown action id, (None, []) when the action was
+    indexed before offsets were recorded, and (source_file, None) when the
+    file is not on this host (e.g. a session merged from another host).
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT a.byte_offset, s.source_file
+        FROM actions a
+        JOIN sessions s ON a.session_id = s.session_id
+        WHERE a.id = ?
+    """, (action_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    if row[0] is None or not row[1]:
+        return None, []
+
+    offset, source_file = row
+    source = Path(source_file)
+    if not source.exists():
+        return source_file, None
+
+    with open_session(source) as f:
+        if source.suffix in COMPRESSED_SUFFIXES:
+            # Archived: no random access, so stream up to the offset
+            window = deque(maxlen=max(before, 0))
+            position, target = 0, b""
+            for line in f:
+                if position >= offset:
+                    target = line
+                    break
+                position += len(line)
+                window.append(line.rstrip(b"\n"))
+            lines_before = list(window)
+        else:
+            lines_before = read_lines_before(f, offset, before)
+            f.seek(offset)
+            target = f.readline()
+        lines_after = [line for line in (f.readline() for _ in range(after)) if line]
+
+    decoded = []
+    for position, lines in (("before", lines_before), ("match", [target]),
+                            ("after", lines_after)):
+        for line in lines:
+            try:
+                msg = json.loads(line.decode(errors="ignore"))
+            except ValueError:
+                continue
+            decoded.append((position, msg.get("timestamp", ""), describe_message(msg)))
+    return source_file, decoded
+
+def format_duration(ms: int) -> str:
+    """Render milliseconds as a compact human-readable duration."""
+    if ms < 1000:
+        return f"{ms}ms"
+    if ms < 60_000:
+        return f"{ms / 1000:.1f}s"
+    return f"{ms / 60_000:.1f}m"
+
+ARCHIVE_FORMATS = {
+    "gz": lambda path: gzip.open(path, "wb"),
+    "xz": lambda path: lzma.open(path, "wb"),
+}
+
+def parse_age(value: str) -> timedelta:
+    """Parse an age like '30d', '2w' or '12h' (bare numbers are days)."""
+    match = re.fullmatch(r"(\d+)([dwh]?)", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid age: {value} (use e.g. 30d, 2w, 12h)")
+    num, unit = int(match.group(1)), match.group(2) or "d"
+    return {"d": timedelta(days=num), "w": timedelta(weeks=num), "h": timedelta(hours=num)}[unit]
+
+def open_archive_writer(path: Path, fmt: str):
+    """Open a compressed writer for the archive format."""
+    if fmt == "zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("writing .zst needs 'pip install zstandard'")
+        return zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"), closefd=True)
+    return ARCHIVE_FORMATS[fmt](path)
+
+def archive_sessions(conn, older_than: timedelta, fmt: str = "gz",
+                     dry_run: bool = False) -> dict:
+    """Compress plain session files not modified within `older_than`, in place.
+
+    The archive keeps the original mtime, so incremental indexing still sees
+    the session as up to date, and stored byte offsets refer to the
+    decompressed stream, so `context` keeps working. Only source_file changes.
+    """
+    cursor = conn.cursor()
+    cutoff = (datetime.now() - older_than).timestamp()
+    result = {"archived": 0, "bytes_before": 0, "bytes_after": 0}
+
+    for project_dir in PROJECTS_DIR.iterdir():
+        if not project_dir.is_dir():
+            continue
+
+        for session_file in project_dir.glob("*.jsonl"):
+            stat = session_file.stat()
+            if stat.st_mtime >= cutoff:
+                continue
+
+            archive = session_file.with_name(f"{session_file.name}.{fmt}")
+            result["archived"] += 1
+            result["bytes_before"] += stat.st_size
+            if dry_run:
+                continue
+
+            tmp = archive.with_name(archive.name + ".tmp")
+            with open(session_file, "rb") as src, open_archive_writer(tmp, fmt) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            shutil.copystat(session_file, tmp)
+            os.replace(tmp, archive)
+            session_file.unlink()
+            result["bytes_after"] += archive.stat().st_size
+
+            cursor.execute("UPDATE sessions SET source_file = ? WHERE source_file = ?",
+                           (str(archive), str(session_file)))
+            conn.commit()
+
+    return result
+
+# Columnar snapshot: one raw little-endian array file per column, memory-mapped
+# on read. project/tool/type/session are dictionary codes into meta.json.
+COLUMN_DTYPES = {
+    "id": "<i8",
+    "ts": "<i8",       # epoch seconds (UTC)
+    "project": "<i4",
+    "tool": "<i4",
+    "type": "<i4",
+    "session": "<i4",
+}
+DICT_COLUMNS = ("project", "tool", "type", "session")
+
+def require_numpy():
+    """Import NumPy, which only the columnar analytics commands need."""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("export-columns/analytics need NumPy (pip install numpy)")
+    return numpy
+
+def export_columns(conn, out_dir: Path = COLUMNS_DIR, rebuild: bool = False,
+                   batch_size: int = 200_000) -> dict:
+    """Append actions with id > the last exported row id to the columnar snapshot.
+
+    Re-indexing deletes and re-inserts a session's actions, so if rows at or
+    below the watermark have changed the snapshot is rebuilt from scratch.
+    meta.json is the commit point: column files are cut back to its row
+    count before appending, so an interrupted run leaves no stray rows.
+    """
+    np = require_numpy()
+    meta_file = out_dir / "meta.json"
+    meta = json.loads(meta_file.read_text()) if meta_file.exists() and not rebuild else None
+
+    if meta:
+        (still_there,) = conn.execute("SELECT COUNT(*) FROM actions WHERE id <= ?",
+                                      (meta["last_row_id"],)).fetchone()
+        if still_there != meta["rows"]:
+            meta = None
+    if meta:
+        for column, dtype in COLUMN_DTYPES.items():
+            path = out_dir / f"{column}.bin"
+            expected = meta["rows"] * np.dtype(dtype).itemsize
+            size = path.stat().st_size if path.exists() else -1
+            if size < expected:
+                meta = None  # column lost rows: rebuild
+                break
+            if size > expected:
+                os.truncate(path, expected)  # rows from an interrupted run
+    if meta is None:
+        meta = {"last_row_id": 0, "rows": 0, "dicts": {c: [] for c in DICT_COLUMNS}}
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for column in COLUMN_DTYPES:
+            (out_dir / f"{column}.bin").write_bytes(b"")
+
+    codes = {c: {v: i for i, v in enumerate(meta["dicts"][c])} for c in DICT_COLUMNS}
+
+    def encode(column, value):
+        mapping = codes[column]
+        if value not in mapping:
+            mapping[value] = len(mapping)
+            meta["dicts"][column].append(value)
+        return mapping[value]
+
+    cursor = conn.execute("""
+        SELECT id, CAST(strftime('%s', timestamp) AS INTEGER),
+               project, tool, action_type, session_id
+        FROM actions
+        WHERE id > ?
+        ORDER BY id
+    """, (meta["last_row_id"],))
+
+    added = 0
+    files = {c: open(out_dir / f"{c}.bin", "ab") for c in COLUMN_DTYPES}
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            ids, ts, projects, tools, types, sessions = zip(*rows)
+            arrays = {
+                "id": ids,
+                "ts": [t or 0 for t in ts],
+                "project": [encode("project", v or "") for v in projects],
+                "tool": [encode("tool", v or "") for v in tools],
+                "type": [encode("type", v or "") for v in types],
+                "session": [encode("session", v or "") for v in sessions],
+            }
+            for column, values in arrays.items():
+                files[column].write(np.asarray(values, dtype=COLUMN_DTYPES[column]).tobytes())
+            meta["last_row_id"] = ids[-1]
+            added += len(rows)
+    finally:
+        for f in files.values():
+            f.close()
+
+    meta["rows"] += added
+    meta["exported_at"] = datetime.now().isoformat()
+    tmp_file = meta_file.with_suffix(".json.tmp")
+    tmp_file.write_text(json.dumps(meta))
+    os.replace(tmp_file, meta_file)
+    return {"added": added, "rows": meta["rows"], "last_row_id": meta["last_row_id"]}
+
+def load_columns(out_dir: Path = COLUMNS_DIR) -> tuple:
+    """Memory-map the snapshot columns; returns (columns, meta)."""
+    np = require_numpy()
+    meta_file = out_dir / "meta.json"
+    if not meta_file.exists():
+        raise RuntimeError(f"No columnar snapshot in {out_dir} (run export-columns)")
+    meta = json.loads(meta_file.read_text())
+    columns = {}
+    for column, dtype in COLUMN_DTYPES.items():
+        path = out_dir / f"{column}.bin"
+        columns[column] = (np.memmap(path, dtype=dtype, mode="r", shape=(meta["rows"],))
+                           if meta["rows"] else np.zeros(0, dtype=dtype))
+    return columns, meta
+
+def analytics(out_dir: Path = COLUMNS_DIR, days: int = 365, project: str = None,
+              top: int = 10) -> dict:
+    """Vectorized activity analytics over the columnar snapshot.
+
+    Hours and weekdays use the machine's current UTC offset.
+    """
+    np = require_numpy()
+    columns, meta = load_columns(out_dir)
+
+    since = int((datetime.now() - timedelta(days=days)).timestamp())
+    mask = columns["ts"] >= since
+    if project:
+        wanted = [i for i, name in enumerate(meta["dicts"]["project"]) if name.startswith(project)]
+        mask &= np.isin(columns["project"], wanted)
+
+    ts = columns["ts"][mask]
+    projects = columns["project"][mask]
+    tools = columns["tool"][mask]
+    sessions = columns["session"][mask]
+
+    local = ts + datetime.now().astimezone().utcoffset().total_seconds()
+    local = local.astype(np.int64)
+    day_number = local // 86400
+    hour = (local % 86400) // 3600
+    weekday = (day_number + 3) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+    heatmap = np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24)
+
+    # Monthly counts per project (months since the window start)
+    month = (local.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64))
+    month_labels = []
+    trends = {}
+    if len(ts):
+        first_month = int(month.min())
+        n_months = int(month.max()) - first_month + 1
+        n_projects = len(meta["dicts"]["project"])
+        grid = np.bincount(projects * n_months + (month - first_month),
+                           minlength=n_projects * n_months).reshape(n_projects, n_months)
+        month_labels = [str(np.datetime64(first_month + i, "M")) for i in range(n_months)]
+        for code in np.argsort(grid.sum(axis=1))[::-1][:top]:
+            if grid[code].sum():
+                trends[meta["dicts"]["project"][code]] = grid[code].tolist()
+
+    tool_counts = np.bincount(tools, minlength=len(meta["dicts"]["tool"]))
+    by_tool = sorted(((meta["dicts"]["tool"][i], int(c)) for i, c in enumerate(tool_counts) if c),
+                     key=lambda x: -x[1])[:top]
+
+    # Session lengths: span between first and last action of each session
+    lengths = np.zeros(0)
+    if len(ts):
+        order = np.argsort(sessions, kind="stable")
+        s_sorted, t_sorted = sessions[order], ts[order]
+        starts = np.flatnonzero(np.r_[True, s_sorted[1:] != s_sorted[:-1]])
+        lengths = (np.maximum.reduceat(t_sorted, starts) - np.minimum.reduceat(t_sorted, starts)) / 60
+    buckets = [0, 5, 15, 30, 60, 120, 240, np.inf]
+    histogram = np.histogram(lengths, bins=buckets)[0].tolist() if len(lengths) else []
+
+    return {
+        "actions": int(mask.sum()),
+        "heatmap": heatmap.tolist(),
+        "months": month_labels,
+        "trends": trends,
+        "by_tool": by_tool,
+        "sessions": int(len(lengths)),
+        "session_minutes": {
+            "p50": float(np.percentile(lengths, 50)) if len(lengths) else 0.0,
+            "p90": float(np.percentile(lengths, 90)) if len(lengths) else 0.0,
+            "max": float(lengths.max()) if len(lengths) else 0.0,
+        },
+        "session_histogram": list(zip(["<5m", "5-15m", "15-30m", "30-60m", "1-2h", "2-4h", ">4h"],
+                                      histogram)),
+    }
+
+def host_from_path(db_path: Path) -> str:
+    """Guess a host name from an rsynced index path, e.g. /srv/box1/.claude/x.db -> box1."""
+    parent = db_path.resolve().parent
+    if parent.name == ".claude":
+        parent = parent.parent
+    return parent.name
+
+def merge_index(conn, source: Path, host: str) -> dict:
+    """Merge another host's session-index.db into this database.
+
+    Only sessions indexed after the host's last merge watermark are read.
+    Sessions are deduplicated by session_id: an incoming copy replaces the
+    existing one only if it extends further (later last_ts).
+    """
+    cursor = conn.cursor()
+    cursor.execute("ATTACH DATABASE ? AS src", (str(source),))
+    try:
+        cursor.execute("SELECT watermark FROM merges WHERE host = ?", (host,))
+        row = cursor.fetchone()
+        watermark = row[0] if row else ""
+
+        # Copy only the columns both schemas have (older hosts lack newer ones)
+        def shared_columns(table):
+            ours = [r[1] for r in cursor.execute(f"PRAGMA main.table_info({table})")]
+            theirs = {r[1] for r in cursor.execute(f"PRAGMA src.table_info({table})")}
+            return [c for c in ours if c in theirs and c not in ("id", "host")]
+
+        session_cols = ", ".join(shared_columns("sessions"))
+        action_cols = ", ".join(shared_columns("actions"))
+
+        cursor.execute("SELECT COUNT(*), MAX(indexed_at) FROM src.sessions WHERE indexed_at > ?",
+                       (watermark,))
+        candidates, new_watermark = cursor.fetchone()
+
+        cursor.execute("DROP TABLE IF EXISTS temp.merge_ids")
+        cursor.execute("""
+            CREATE TEMP TABLE merge_ids AS
+            SELECT s.session_id
+            FROM src.sessions s
+            LEFT JOIN main.sessions m ON m.session_id = s.session_id
+            WHERE s.indexed_at > ?
+              AND (m.session_id IS NULL OR COALESCE(m.last_ts, '') < s.last_ts)
+        """, (watermark,))
+        cursor.execute("SELECT COUNT(*) FROM temp.merge_ids")
+        merged = cursor.fetchone()[0]
+
+        cursor.execute("""
+            DELETE FROM main.actions
+            WHERE session_id IN (SELECT session_id FROM temp.merge_ids)
+        """)
+        cursor.execute("""
+            DELETE FROM main.sessions
+            WHERE session_id IN (SELECT session_id FROM temp.merge_ids)
+        """)
+        cursor.execute(f"""
+            INSERT INTO main.sessions ({session_cols}, host)
+            SELECT {session_cols}, ? FROM src.sessions
+            WHERE session_id IN (SELECT session_id FROM temp.merge_ids)
+        """, (host,))
+        cursor.execute(f"""
+            INSERT INTO main.actions ({action_cols})
+            SELECT {action_cols} FROM src.actions
+            WHERE session_id IN (SELECT session_id FROM temp.merge_ids)
+            ORDER BY id
+        """)
+        actions = cursor.rowcount
+
+        if new_watermark:
+            cursor.execute("""
+                INSERT OR REPLACE INTO merges (host, source, watermark, merged_at)
+                VALUES (?, ?, ?, ?)
+            """, (host, str(source), new_watermark, datetime.now().isoformat()))
+        conn.commit()
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS temp.merge_ids")
+        cursor.execute("DETACH DATABASE src")
+
+    return {
+        "host": host,
+        "merged": merged,
+        "skipped": candidates - merged,
+        "actions": actions,
+        "watermark": new_watermark or watermark,
+    }
+
 def stats(conn):
     """Show database statistics."""
     cursor = conn.cursor()
@@ -330,12 +1578,21 @@ def stats(conn):
     cursor.execute("SELECT MIN(date), MAX(date) FROM actions")
     date_range = cursor.fetchone()
 
+    cursor.execute("""
+        SELECT COALESCE(host, 'local'), COUNT(*) as count
+        FROM sessions
+        GROUP BY host
+        ORDER BY count DESC
+    """)
+    by_host = cursor.fetchall()
+
     return {
         "sessions": sessions,
         "actions": actions,
         "by_project": by_project,
         "by_tool": by_tool,
         "date_range": date_range,
+        "by_host": by_host,
     }
 
 def main():
@@ -346,13 +1603,30 @@ def main():
     index_parser = subparsers.add_parser("index", help="Build/update index")
     index_parser.add_argument("--force", action="store_true", help="Force full reindex")
     index_parser.add_argument("--project", help="Filter by project name")
+    index_parser.add_argument("--wait", action="store_true",
+                              help="Wait for sessions another indexer is working on")
+
+    index_parser.add_argument("--root", type=Path, action="append",
+                              help="Also index this project's .claude/ docs (repeatable)")
+
+    # Ingest command (hooks)
+    ingest_parser = subparsers.add_parser("ingest", help="Index new lines of one session transcript")
+    ingest_parser.add_argument("--transcript", required=True,
+                               help="Session JSONL path, or '-' to read a hook payload "
+                                    "(transcript_path) from stdin")
+    ingest_parser.add_argument("--budget-ms", type=int, default=500,
+                               help="Latency budget in milliseconds (default: 500)")
+    ingest_parser.add_argument("--quiet", action="store_true", help="No output (for hooks)")
 
     # Search command
     search_parser = subparsers.add_parser("search", help="Search sessions")
-    search_parser.add_argument("query", help="Search query")
-    search_parser.add_argument("--project", help="Filter by project")
+    search_parser.add_argument("query", help="Search query, e.g. 'tool:Bash after:7d pytest' "
+                               "(keys: tool, type, project, session, after, before)")
+    search_parser.add_argument("--project", help="Filter by project (prefix)")
     search_parser.add_argument("--days", type=int, help="Limit to last N days")
     search_parser.add_argument("--limit", type=int, default=30, help="Max results")
+    search_parser.add_argument("--explain", action="store_true",
+                               help="Show compiled SQL and query plan instead of results")
 
     # Timeline command
     timeline_parser = subparsers.add_parser("timeline", help="Show recent activity")
@@ -364,28 +1638,139 @@ def main():
     files_parser.add_argument("pattern", nargs="?", help="File path pattern")
     files_parser.add_argument("--days", type=int, default=7, help="Days to search")
 
+    # Slow command
+    slow_parser = subparsers.add_parser("slow", help="Show slowest tool calls")
+    slow_parser.add_argument("--by", choices=["command", "tool", "project"],
+                             default="command", help="Grouping (default: command)")
+    slow_parser.add_argument("--days", type=int, help="Limit to last N days")
+    slow_parser.add_argument("--project", help="Filter by project")
+    slow_parser.add_argument("--limit", type=int, default=20, help="Max rows")
+
+    # Context command
+    context_parser = subparsers.add_parser("context", help="Show conversation around an action")
+    context_parser.add_argument("action_id", type=int, help="Action id (from search output)")
+    context_parser.add_argument("--before", type=int, default=5, help="Lines before")
+    context_parser.add_argument("--after", type=int, default=5, help="Lines after")
+
+    # Merge command
+    merge_parser = subparsers.add_parser("merge", help="Merge other hosts' session-index.db files")
+    merge_parser.add_argument("sources", nargs="+", type=Path, help="session-index.db paths")
+    merge_parser.add_argument("--host", help="Host tag (default: derived from each path)")
+
+    # Archive command
+    archive_parser = subparsers.add_parser("archive", help="Compress cold session files in place")
+    archive_parser.add_argument("--older-than", type=parse_age, default=parse_age("30d"),
+                                help="Age threshold, e.g. 30d, 2w (default: 30d)")
+    archive_parser.add_argument("--format", choices=["gz", "xz", "zst"], default="gz",
+                                help="Compression (default: gz; zst needs zstandard)")
+    archive_parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+
+    # Handoffs command
+    handoffs_parser = subparsers.add_parser("handoffs", help="List .claude/transitions handoffs")
+    handoffs_parser.add_argument("query", nargs="?", help="Only handoffs mentioning this")
+    handoffs_parser.add_argument("--latest", action="store_true", help="Show the newest handoff in full")
+    handoffs_parser.add_argument("--path-only", action="store_true", help="Print only file paths")
+    handoffs_parser.add_argument("--root", type=Path, default=Path.cwd(),
+                                 help="Project root (default: current directory)")
+    handoffs_parser.add_argument("--all", action="store_true", help="Across all indexed projects")
+    handoffs_parser.add_argument("--limit", type=int, default=10, help="Max results")
+
+    # Memory search command
+    memory_parser = subparsers.add_parser("memory-search", help="Search .claude/memory notes")
+    memory_parser.add_argument("query", help="Search terms")
+    memory_parser.add_argument("--root", type=Path, default=Path.cwd(),
+                               help="Project root (default: current directory)")
+    memory_parser.add_argument("--all", action="store_true", help="Across all indexed projects")
+    memory_parser.add_argument("--limit", type=int, default=20, help="Max results")
+
+    # Memory freshness command
+    freshness_parser = subparsers.add_parser("memory-freshness",
+                                             help="Rank stale .claude/memory notes")
+    freshness_parser.add_argument("--root", type=Path, default=Path.cwd(),
+                                  help="Project root (default: current directory)")
+    freshness_parser.add_argument("--days", type=int, default=30,
+                                  help="Age after which a validated note is stale (default: 30)")
+    freshness_parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    # Columnar export + analytics commands
+    export_parser = subparsers.add_parser("export-columns",
+                                          help="Write/update the columnar snapshot (NumPy)")
+    export_parser.add_argument("--out", type=Path, default=COLUMNS_DIR, help="Snapshot directory")
+    export_parser.add_argument("--rebuild", action="store_true", help="Re-export from scratch")
+
+    analytics_parser = subparsers.add_parser("analytics", help="Activity analytics from the snapshot")
+    analytics_parser.add_argument("--out", type=Path, default=COLUMNS_DIR, help="Snapshot directory")
+    analytics_parser.add_argument("--days", type=int, default=365, help="Window in days (default: 365)")
+    analytics_parser.add_argument("--project", help="Filter by project (prefix)")
+    analytics_parser.add_argument("--no-update", action="store_true",
+                                  help="Skip the incremental export before analysing")
+    analytics_parser.add_argument("--json", action="store_true", help="Output as JSON")
+
     # Stats command
     subparsers.add_parser("stats", help="Show database statistics")
 
     args = parser.parse_args()
 
-    # Connect to database
-    conn = sqlite3.connect(DB_PATH)
+    if args.command == "ingest":
+        # Hook entry point: never fail the hook, never wait past the budget
+        transcript = args.transcript
+        if transcript == "-":
+            try:
+                transcript = json.load(sys.stdin).get("transcript_path", "")
+            except ValueError:
+                transcript = ""
+        if not transcript or not Path(transcript).expanduser().is_file():
+            return
+        try:
+            conn = sqlite3.connect(DB_PATH, timeout=args.budget_ms / 1000)
+            init_db(conn)
+            result = ingest_transcript(conn, Path(transcript).expanduser(), args.budget_ms)
+            conn.close()
+        except (sqlite3.OperationalError, RuntimeError) as e:
+            if not args.quiet:
+                print(f"⚠️  Ingest skipped: {e}")
+            return
+        if not args.quiet:
+            state = "" if result["complete"] else " (budget reached, more pending)"
+            if result.get("busy"):
+                state = " (being indexed by another process)"
+            print(f"Ingested {result['actions']} actions from {result['session_id']}{state}")
+        return
+
+    # Connect to database (writes are short per-batch transactions)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
     init_db(conn)
 
     if args.command == "index":
         print(f"Indexing sessions from {PROJECTS_DIR}...")
-        result = index_sessions(conn, args.force, args.project)
-        print(f"Done: {result['new']} new, {result['updated']} updated, "
-              f"{result['skipped']} skipped, {result['actions']} actions indexed")
+        result = index_sessions(conn, args.force, args.project, args.wait)
+        if result["new"] or result["updated"]:
+            print(f"Done: {result['new']} new, {result['updated']} updated, "
+                  f"{result['skipped']} skipped, {result['actions']} actions indexed")
+        elif not result["busy"]:
+            print(f"✓ Already fresh ({result['skipped']} sessions unchanged)")
+        if result["busy"]:
+            print(f"⏳ {result['busy']} sessions are being indexed by another process "
+                  f"(--wait to wait for them)")
+        docs = index_documents(conn, project_roots() + (args.root or []), args.force)
+        print(f"Docs: {docs['indexed']} indexed, {docs['skipped']} unchanged, "
+              f"{docs['removed']} removed (handoffs + memory)")
+
+    elif args.command == "search" and args.explain:
+        sql, params, plan = explain_search(conn, args.query, args.project, args.days, args.limit)
+        print(f"=== Query plan: '{args.query}' ===\n")
+        print(" ".join(sql.split()))
+        print(f"params: {params}\n")
+        for step in plan:
+            print(f"  {step}")
 
     elif args.command == "search":
         results = search(conn, args.query, args.project, args.days, args.limit)
         print(f"=== Search: '{args.query}' ({len(results)} results) ===\n")
         for row in results:
-            date, ts, project, tool, atype, detail = row
+            action_id, date, ts, project, tool, atype, detail = row
             proj_short = project[:20] if len(project) > 20 else project
-            print(f"{date} | {proj_short:20} | {tool:8} | {detail[:60]}")
+            print(f"{action_id:>7} | {date} | {proj_short:20} | {tool:8} | {detail[:60]}")
 
     elif args.command == "timeline":
         results = timeline(conn, args.days, args.project)
@@ -407,12 +1792,150 @@ def main():
             proj_short = project[:15] if len(project) > 15 else project
             print(f"{date} | {proj_short:15} | {tool:5} | {detail}")
 
+    elif args.command == "slow":
+        results = slow(conn, args.by, args.days, args.project, args.limit)
+        print(f"=== Slowest by {args.by} ({len(results)} groups) ===\n")
+        print(f"{args.by[:30]:30} | {'calls':>5} | {'p50':>7} | {'p95':>7} | {'max':>7} | {'total':>7}")
+        for key, calls, p50, p95, max_ms, total in results:
+            key_short = key[:30] if len(key) > 30 else key
+            print(f"{key_short:30} | {calls:5} | {format_duration(p50):>7} | "
+                  f"{format_duration(p95):>7} | {format_duration(max_ms):>7} | "
+                  f"{format_duration(total):>7}")
+
+    elif args.command == "context":
+        result = context(conn, args.action_id, args.before, args.after)
+        if result is None:
+            print(f"No action with id {args.action_id}")
+        elif result[0] is None:
+            print(f"No source location for action {args.action_id} "
+                  f"(run 'index --force' to record offsets)")
+        elif result[1] is None:
+            print(f"Source file not available on this host: {result[0]}")
+        else:
+            source_file, decoded = result
+            print(f"=== Context for action {args.action_id} ===")
+            print(f"Source: {source_file}\n")
+            for position, ts, lines in decoded:
+                marker = ">>" if position == "match" else "  "
+                for line in lines:
+                    print(f"{marker} {ts[:19]:19} | {line}")
+
+    elif args.command == "merge":
+        for source in args.sources:
+            if not source.exists():
+                print(f"⚠️  Skipping {source} (not found)")
+                continue
+            host = args.host or host_from_path(source)
+            result = merge_index(conn, source, host)
+            print(f"Merged {host}: {result['merged']} sessions, {result['actions']} actions, "
+                  f"{result['skipped']} skipped (watermark {result['watermark'] or 'none'})")
+
+    elif args.command == "archive":
+        try:
+            result = archive_sessions(conn, args.older_than, args.format, args.dry_run)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        mb_before = result["bytes_before"] / 1e6
+        if args.dry_run:
+            print(f"Would archive {result['archived']} sessions ({mb_before:.1f} MB)")
+        else:
+            mb_after = result["bytes_after"] / 1e6
+            print(f"Archived {result['archived']} sessions: "
+                  f"{mb_before:.1f} MB -> {mb_after:.1f} MB ({args.format})")
+
+    elif args.command in ("handoffs", "memory-search"):
+        # Refresh the current project first (mtime check) so new files show up
+        root = None if args.all else args.root.resolve()
+        if root:
+            index_documents(conn, [root])
+
+        if args.command == "memory-search":
+            results = memory_search(conn, args.query, root, args.limit)
+            print(f"=== Memory: '{args.query}' ({len(results)} results) ===\n")
+            for path, heading, ts, snippet in results:
+                print(f"{ts[:10]} | {path}")
+                print(f"    # {heading}" if heading else "    (preamble)")
+                print(f"    {' '.join(snippet.split())}")
+        else:
+            limit = 1 if args.latest else args.limit
+            results = handoffs(conn, root, args.query, limit)
+            if args.path_only:
+                for path, *_ in results:
+                    print(path)
+            elif args.latest and results:
+                path, ts, project, _ = results[0]
+                print(f"📋 Latest handoff: {path}")
+                print(f"   Created: {ts}\n")
+                for heading, body in document_sections(conn, path):
+                    if heading:
+                        print(f"## {heading}")
+                    if body:
+                        print(f"{body}\n")
+            else:
+                print(f"=== Handoffs ({len(results)}) ===\n")
+                for path, ts, project, sections in results:
+                    print(f"{ts[:19]} | {project[:20]:20} | {path}")
+
+    elif args.command == "memory-freshness":
+        results = memory_freshness(conn, args.root, args.days)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print(f"=== Memory freshness ({len(results)} notes) ===\n")
+            print(f"{'File':40} | {'Validated':10} | {'Days':>4} | Status")
+            for r in results:
+                age = "-" if r["age_days"] is None else r["age_days"]
+                print(f"{r['file'][:40]:40} | {r['validated'] or 'N/A':10} | {age:>4} | {r['status']}")
+                for ref, day in r["changed_refs"][:5]:
+                    print(f"    changed {day}: {ref}")
+
+    elif args.command in ("export-columns", "analytics"):
+        try:
+            if args.command == "export-columns" or not args.no_update:
+                result = export_columns(conn, args.out, getattr(args, "rebuild", False))
+                if args.command == "export-columns":
+                    print(f"Exported {result['added']} new actions "
+                          f"({result['rows']} total, last id {result['last_row_id']}) to {args.out}")
+            if args.command == "analytics":
+                a = analytics(args.out, args.days, args.project)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+        if args.command == "analytics" and args.json:
+            print(json.dumps(a, indent=2))
+        elif args.command == "analytics":
+            print(f"=== Activity (last {args.days} days, {a['actions']} actions) ===\n")
+            print("--- Hour of Day x Weekday ---")
+            print("     " + "".join(f"{h:>5}" for h in range(0, 24, 2)))
+            for day, row in zip(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], a["heatmap"]):
+                pairs = [row[h] + row[h + 1] for h in range(0, 24, 2)]
+                print(f"  {day}" + "".join(f"{c:>5}" for c in pairs))
+            print(f"\n--- Projects by Month ({a['months'][0] if a['months'] else '-'} .. "
+                  f"{a['months'][-1] if a['months'] else '-'}) ---")
+            for proj, counts in a["trends"].items():
+                recent = " ".join(f"{c}" for c in counts[-6:])
+                print(f"  {sum(counts):6} | {proj[:25]:25} | last 6 months: {recent}")
+            print("\n--- Actions by Tool ---")
+            for tool, count in a["by_tool"]:
+                print(f"  {count:6} | {tool}")
+            m = a["session_minutes"]
+            print(f"\n--- Session Length ({a['sessions']} sessions) ---")
+            print(f"  p50 {m['p50']:.0f}m | p90 {m['p90']:.0f}m | max {m['max']:.0f}m")
+            for label, count in a["session_histogram"]:
+                print(f"  {label:>7} | {count}")
+
     elif args.command == "stats":
         s = stats(conn)
         print(f"=== Session Database Stats ===")
         print(f"Sessions: {s['sessions']}")
         print(f"Actions: {s['actions']}")
         print(f"Date range: {s['date_range'][0]} to {s['date_range'][1]}")
+        if len(s['by_host']) > 1:
+            print("\n--- Sessions by Host ---")
+            for host, count in s['by_host']:
+                print(f"  {count:4} | {host}")
         print(f"\n--- Sessions by Project ---")
         for proj, count in s['by_project']:
             print(f"  {count:4} | {proj}")
@@ -12,7 +12,10 @@ Usage:
     ./session-index.py --search "query" [--since 2d]
 """
 
+import gzip
+import io
 import json
+import lzma
 import sys
 import re
 from datetime import datetime, timedelta
@@ -26,12 +29,28 @@ def get_session_dir(project_path: str) -> Path:
     claude_name = "-" + str(project_path).lstrip("/").replace("/", "-")
     return Path.home() / ".claude/projects" / claude_name
 
+def open_session(session_file: Path):
+    """Open a plain or archived (.gz/.xz/.zst) session file as text."""
+    if session_file.suffix == ".gz":
+        return gzip.open(session_file, "rt", errors="ignore")
+    if session_file.suffix == ".xz":
+        return lzma.open(session_file, "rt", errors="ignore")
+    if session_file.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError(f"{session_file.name}: reading .zst needs 'pip install zstandard'")
+        raw = open(session_file, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, errors="ignore")
+    return open(session_file, errors="ignore")
+
 def extract_actions(session_file: Path, since: datetime = None) -> list:
     """Extract actions from a session file."""
     actions = []
 
-    with open(session_file) as f:
-        lines = f.readlines()
+    with open_session(session_file) as f:
+        lines = list(f)
 
     for i, line in enumerate(lines):
         try:
@@ -114,10 +133,16 @@ def build_index(project_path: str, days: int = 7) -> dict:
     commands_run = []
     summaries = []
 
-    for session_file in sorted(session_dir.glob("*.jsonl"),
+    session_files = [f for f in session_dir.glob("*.jsonl*")
+                     if f.suffix in (".jsonl", ".gz", ".xz", ".zst")]
+    for session_file in sorted(session_files,
                                 key=lambda f: f.stat().st_mtime,
                                 reverse=True):
-        actions = extract_actions(session_file, since)
+        try:
+            actions = extract_actions(session_file, since)
+        except RuntimeError as e:
+            print(f"⚠️  Skipping {e}")
+            continue
         all_actions.extend(actions)
 
         for action in actions:
@@ -33,7 +33,17 @@ if [ ! -d "$SESSION_DIR" ]; then
     exit 1
 fi
 
-SESSION_COUNT=$(ls -1 "$SESSION_DIR"/*.jsonl 2>/dev/null | wc -l)
+# Print a session file, decompressing archived (.gz/.xz/.zst) sessions
+read_session() {
+    case "$1" in
+        *.jsonl.gz)  gzip -dc "$1" ;;
+        *.jsonl.xz)  xz -dc "$1" ;;
+        *.jsonl.zst) zstd -dcq "$1" ;;
+        *)           cat "$1" ;;
+    esac
+}
+
+SESSION_COUNT=$(find "$SESSION_DIR" -maxdepth 1 -name '*.jsonl*' | wc -l)
 
 echo "=== Session Search: '$QUERY' ==="
 echo "Project: $PROJECT_PATH"
@@ -43,45 +53,48 @@ echo ""
 if [ "$SUMMARIES_ONLY" = "--summaries-only" ]; then
     # Fast path: just search summaries
     echo "--- Matching Summaries ---"
-    for f in "$SESSION_DIR"/*.jsonl; do
-        grep -i "$QUERY" "$f" 2>/dev/null | \
+    for f in "$SESSION_DIR"/*.jsonl*; do
+        [ -f "$f" ] || continue
+        read_session "$f" 2>/dev/null | grep -i "$QUERY" | \
             jq -r 'select(.type=="summary") | .summary' 2>/dev/null
     done | sort -u | head -30
     exit 0
 fi
 
 # Full search
-for SESSION_FILE in $(ls -t "$SESSION_DIR"/*.jsonl 2>/dev/null | head -20); do
+for SESSION_FILE in $(ls -t "$SESSION_DIR"/*.jsonl* 2>/dev/null | head -20); do
     [ -f "$SESSION_FILE" ] || continue
 
     SESSION_DATE=$(stat -c %y "$SESSION_FILE" 2>/dev/null | cut -d' ' -f1)
 
-    # Check if file contains query
-    if grep -qi "$QUERY" "$SESSION_FILE" 2>/dev/null; then
+    # Decompress/scan each file once; the extractors below reuse the matches
+    MATCHES=$(read_session "$SESSION_FILE" 2>/dev/null | grep -i "$QUERY" || true)
+
+    if [ -n "$MATCHES" ]; then
         echo "--- $SESSION_DATE ---"
 
         # Extract summaries
-        grep -i "$QUERY" "$SESSION_FILE" 2>/dev/null | \
+        echo "$MATCHES" | \
             jq -r 'select(.type=="summary") | "📋 " + .summary' 2>/dev/null | head -5
 
         # Extract user questions containing query
-        grep -i "$QUERY" "$SESSION_FILE" 2>/dev/null | \
+        echo "$MATCHES" | \
             jq -r 'select(.type=="user") | .message.content |
                    if type=="string" then .
                    elif type=="array" then (.[0].text // .[0].content // "")
                    else "" end' 2>/dev/null | \
             grep -i "$QUERY" | \
             sed 's/^/❓ /' | \
-            cut -c1-120 | head -3
+            cut -c1-120 | head -3 || true
 
         # Extract decisions/conclusions from assistant
-        grep -i "$QUERY" "$SESSION_FILE" 2>/dev/null | \
+        echo "$MATCHES" | \
             jq -r 'select(.type=="assistant") | .message.content[]? |
                    select(.type=="text") | .text' 2>/dev/null | \
             grep -i "$QUERY" | \
             grep -iE "(decided|chose|will|should|recommend|conclusion|verdict|result)" | \
             sed 's/^/💡 /' | \
-            cut -c1-150 | head -3
+            cut -c1-150 | head -3 || true
 
         echo ""
     fi